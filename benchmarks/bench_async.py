@@ -0,0 +1,73 @@
+import numpy as np
+
+from enflow.experiments import AsyncExperiment, Instrumentation, InstrumentedModel, LatencyModel
+
+N_EPISODES = 32
+N_STEPS = 10
+LATENCY = 1e-3
+
+
+class CounterEnv:
+    """
+    An environment whose observation is the seed and the step, and that checks that the actions of an episode
+    arrive in order: the reward is the seed of the action, and a step with the action of another step fails.
+    """
+
+    def reset(self, seed=None):
+        self.seed = seed or 0
+        self.i = 0
+        return np.array([self.seed, 0.0])
+
+    def step(self, action):
+        assert action[1] == self.i, "The actions of an episode arrived out of order."
+        self.i += 1
+        return np.array([self.seed, float(self.i)]), float(action[0]), False, self.i >= N_STEPS, {}
+
+
+class EchoAgent:
+    """
+    An agent that acts with its observation.
+    """
+
+    def act(self, observation):
+        return observation
+
+
+class Problem:
+    environment = CounterEnv()
+    objective = None
+
+
+class AsyncExperimentSuite:
+    """
+    Running episodes concurrently against a model with a simulated round trip of LATENCY seconds, see
+    :class:`LatencyModel`. The wall time should shrink about in proportion to max_concurrency, from
+    N_EPISODES * N_STEPS * LATENCY at a concurrency of 1. The setup checks that each episode got its own actions in
+    order and that the instrumented model timed every awaited call.
+    """
+    params = [1, 8, 32]
+    param_names = ["max_concurrency"]
+    number = 1
+    repeat = 3
+
+    def setup(self, max_concurrency):
+        self.seeds = list(range(N_EPISODES))
+        self.experiment = AsyncExperiment(Problem(), LatencyModel(EchoAgent(), latency=LATENCY),
+                                          n_episodes=N_EPISODES, max_concurrency=max_concurrency)
+
+        instrumentation = Instrumentation()
+        model = InstrumentedModel(LatencyModel(EchoAgent(), latency=LATENCY), instrumentation, prefix="remote")
+        self.instrumented = AsyncExperiment(Problem(), model, n_episodes=N_EPISODES, max_concurrency=max_concurrency,
+                                            instrumentation=instrumentation)
+        results = self.instrumented.run(seeds=self.seeds)
+        for seed, result in zip(self.seeds, results):
+            assert result.n_steps == N_STEPS and np.all(result.rewards == seed), "An episode got the wrong actions."
+        wall = np.asarray(instrumentation.samples["remote.act"][0])
+        assert len(wall) == N_EPISODES * N_STEPS, "Not every call of the model was timed."
+        assert wall.min() >= LATENCY, "The model phase did not include the awaited latency."
+
+    def time_run(self, max_concurrency):
+        self.experiment.run(seeds=self.seeds)
+
+    def time_run_instrumented(self, max_concurrency):
+        self.instrumented.run(seeds=self.seeds)
@@ -0,0 +1,30 @@
+from .synthetic import gefcom_frame, gefcom_scores, gefcom_spaces
+
+
+class GEFCom2014SolarEnvSuite:
+    """
+    Resetting and stepping the GEFCom2014 solar environment on synthetic data of the same size as the original.
+    """
+
+    def setup(self):
+        try:
+            from enflow.examples.gefcom2014_solar.problem import GEFCom2014SolarEnv, make_dataset
+        except ImportError:
+            raise NotImplementedError("The GEFCom2014 solar example cannot be imported.")
+        state_space, action_space = gefcom_spaces(99)
+        dataset = make_dataset(gefcom_frame(), gefcom_scores())
+        self.env = GEFCom2014SolarEnv(dataset=dataset, state_space=state_space, action_space=action_space)
+        self.env.reset()
+
+    def time_reset(self):
+        self.env.reset()
+
+    def time_step(self):
+        self.env.idx_counter = 0
+        self.env.step()
+
+    def time_episode(self):
+        self.env.reset()
+        done = False
+        while not done:
+            _, _, done = self.env.step()
@@ -0,0 +1,54 @@
+import functools
+import os
+import shutil
+import tempfile
+
+from enflow.utils.loader import list_problems, load_problem
+
+from .synthetic import gefcom_frame, gefcom_scores
+
+
+class LoaderSuite:
+    """
+    Listing the example problems, which imports their modules without reading data files. Loading is measured by
+    :class:`GEFCom2014SolarLoaderSuite`, since the loaders of the other examples are stubs that return None.
+    """
+
+    def time_list_problems(self):
+        list_problems()
+
+
+class GEFCom2014SolarLoaderSuite:
+    """
+    Loading the GEFCom2014 solar problem with load_problem, as the workers of an ExperimentGrid do: reading the data
+    and scores with load_data and building the dataset, environment and objective. The data are synthetic frames of
+    the size of the original data, written to CSV files in the format that load_data reads.
+    """
+
+    def setup(self):
+        try:
+            from enflow.examples.gefcom2014_solar import problem
+        except ImportError:
+            raise NotImplementedError("The GEFCom2014 solar example cannot be imported.")
+        self.directory = tempfile.mkdtemp()
+        data_path = os.path.join(self.directory, "gefcom2014-solar.csv")
+        scores_path = os.path.join(self.directory, "gefcom2014-solar-scores.csv")
+        gefcom_frame().to_csv(data_path)
+        gefcom_scores().to_csv(scores_path)
+
+        self.problem = problem
+        self.load_data = problem.load_data
+        problem.load_data = functools.partial(self.load_data, data_path, scores_path)
+
+    def teardown(self):
+        self.problem.load_data = self.load_data
+        shutil.rmtree(self.directory)
+
+    def time_load_data(self):
+        self.problem.load_data()
+
+    def time_load_problem(self):
+        load_problem("gefcom2014-solar:simple")
+
+    def peakmem_load_problem(self):
+        load_problem("gefcom2014-solar:simple")
@@ -0,0 +1,36 @@
+import numpy as np
+
+from enflow.problems.objective import PinballLoss
+
+from .synthetic import quantile_forecasts
+
+
+class PinballLossSuite:
+    """
+    The pinball loss of quantile forecasts of three sites, as DataFrames and as arrays. The setup checks that the
+    loss does not depend on the order of the quantile columns of each site.
+    """
+    params = ([744, 8760], [3, 9, 99])
+    param_names = ["n_rows", "n_quantiles"]
+
+    def setup(self, n_rows, n_quantiles):
+        self.y_true, self.y_preds, quantiles = quantile_forecasts(n_rows, n_quantiles)
+        self.objective = PinballLoss(quantiles)
+        self.true_array = self.y_true.to_numpy()
+        self.preds_array = self.y_preds.to_numpy().reshape(n_rows, self.true_array.shape[1], n_quantiles)
+
+        # The quantile columns of each site in another order must give the same loss
+        rng = np.random.default_rng(0)
+        permuted = self.y_preds[[(site, label) for site in self.y_true.columns
+                                 for label in rng.permutation(self.y_preds[site].columns)]]
+        expected = self.objective.calculate(self.true_array, self.preds_array)
+        assert self.objective.calculate(self.y_true, permuted) == expected, "Permuted quantile columns changed the loss."
+
+    def time_calculate_frame(self, n_rows, n_quantiles):
+        self.objective.calculate(self.y_true, self.y_preds)
+
+    def time_calculate_array(self, n_rows, n_quantiles):
+        self.objective.calculate(self.true_array, self.preds_array)
+
+    def peakmem_calculate_frame(self, n_rows, n_quantiles):
+        self.objective.calculate(self.y_true, self.y_preds)
@@ -0,0 +1,25 @@
+from .synthetic import solar_battery_frame, solar_battery_system
+
+
+class LPSolverSuite:
+    """
+    The linear program of the PV and battery example over horizons from a day to a year. Requires ortools: without
+    it, setup raises NotImplementedError and the suite is reported as skipped.
+    """
+    params = [24, 168, 720, 8760]
+    param_names = ["hours"]
+    number = 1
+    repeat = 3
+    timeout = 600
+
+    def setup(self, hours):
+        try:
+            from enflow.examples.solar_battery.Models.PV_BESS_LP_opt import PV_BESS_LP_solver
+        except ImportError:
+            raise NotImplementedError("ortools is not installed.")
+        self.solver = PV_BESS_LP_solver
+        self.data = solar_battery_frame(hours)
+        self.system = solar_battery_system()
+
+    def time_solve(self, hours):
+        self.solver(self.data, self.system)
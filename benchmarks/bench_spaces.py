@@ -0,0 +1,28 @@
+from .synthetic import gefcom_spaces
+
+
+class DataFrameSpaceSuite:
+    """
+    Sampling and membership checks of the GEFCom2014 solar state and action spaces.
+    """
+    params = ([24, 744, 8760], [3, 9, 99])
+    param_names = ["n_rows", "n_quantiles"]
+
+    def setup(self, n_rows, n_quantiles):
+        self.state_space, self.action_space = gefcom_spaces(n_quantiles)
+        self.state_space.seed(0)
+        self.action_space.seed(0)
+        self.state = self.state_space.sample(n_rows)
+        self.action = self.action_space.sample(n_rows)
+
+    def time_sample_state(self, n_rows, n_quantiles):
+        self.state_space.sample(n_rows)
+
+    def time_sample_action(self, n_rows, n_quantiles):
+        self.action_space.sample(n_rows)
+
+    def time_contains_state(self, n_rows, n_quantiles):
+        self.state_space.contains(self.state)
+
+    def time_contains_action(self, n_rows, n_quantiles):
+        self.action_space.contains(self.action)
@@ -0,0 +1,196 @@
+"""
+Run the benchmarks without asv and compare them with earlier runs.
+
+The benchmark classes follow the asv conventions: methods named time_* are timed, peakmem_* methods report their
+peak memory, ``params`` and ``param_names`` define the parameter grid, and a setup that raises
+NotImplementedError skips the benchmark, with the message of the error printed as the reason. The results are appended to a JSON lines history, by default
+.benchmarks/history.jsonl, and each result is compared with the last result of the same benchmark, parameters and
+machine in the history::
+
+    python -m benchmarks.run
+    python -m benchmarks.run -k PinballLoss --repeat 10
+
+With asv installed, ``asv run`` and ``asv compare`` run the same benchmarks with asv.conf.json.
+"""
+import argparse
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pkgutil
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+PREFIXES = ("time_", "peakmem_")
+
+
+def discover(pattern=None):
+    """
+    Find the benchmarks in the bench_* modules of this package.
+    :param pattern: str, optional substring that the full benchmark name must contain.
+    :return: list of (name, class, method name) tuples.
+    """
+    benchmarks = []
+    for module_info in pkgutil.iter_modules([str(Path(__file__).parent)]):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"{__package__}.{module_info.name}")
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(vars(cls)):
+                if method.startswith(PREFIXES):
+                    name = f"{module_info.name}.{class_name}.{method}"
+                    if pattern is None or pattern in name:
+                        benchmarks.append((name, cls, method))
+    return benchmarks
+
+
+def param_grid(cls):
+    """
+    Get the parameter combinations of a benchmark class, as asv does.
+    """
+    params = getattr(cls, "params", None)
+    if not params:
+        return [()]
+    if not all(isinstance(values, (list, tuple)) for values in params):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def measure(cls, method, params, repeat):
+    """
+    Run one benchmark for one parameter combination.
+    :return: dict of the measurements, or with only the reason under "skipped" if the setup skips the benchmark.
+    """
+    bench = cls()
+    try:
+        if hasattr(bench, "setup"):
+            bench.setup(*params)
+    except NotImplementedError as error:
+        return {"skipped": str(error) or "NotImplementedError"}
+    func = getattr(bench, method)
+    try:
+        if method.startswith("peakmem_"):
+            tracemalloc.start()
+            func(*params)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return {"peakmem": peak}
+
+        timer = timeit.Timer(lambda: func(*params))
+        number = getattr(bench, "number", 0) or timer.autorange()[0]
+        repeat = getattr(bench, "repeat", 0) or repeat
+        times = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+        return {
+            "median": statistics.median(times),
+            "min": min(times),
+            "iqr": float(np.subtract(*np.percentile(times, [75, 25]))),
+            "number": number,
+            "repeat": repeat,
+        }
+    finally:
+        if hasattr(bench, "teardown"):
+            bench.teardown(*params)
+
+
+def environment():
+    """
+    Describe the machine, versions and commit that the results were measured with.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "machine": platform.node(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def load_history(path):
+    """
+    Read the history of results, one JSON record per line.
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def format_value(record):
+    if record is None:
+        return "-"
+    if "peakmem" in record:
+        return f"{record['peakmem'] / 2 ** 20:.1f}M"
+    value = record["median"]
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if value >= scale:
+            return f"{value / scale:.3g}{unit}"
+    return f"{value / 1e-9:.3g}ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timings per benchmark")
+    parser.add_argument("--history", default=str(ROOT / ".benchmarks" / "history.jsonl"), help="results history file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change reported as a regression")
+    parser.add_argument("--no-save", action="store_true", help="do not append the results to the history")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    info = environment()
+    previous = {}
+    for record in history:
+        if record.get("machine") == info["machine"]:
+            previous[record["benchmark"], json.dumps(record["params"])] = record
+
+    records, regressions = [], 0
+    for name, cls, method in discover(args.filter):
+        for params in param_grid(cls):
+            result = measure(cls, method, params, args.repeat)
+            label = f"{name}({', '.join(map(str, params))})"
+            if "skipped" in result:
+                print(f"{label:<80} skipped: {result['skipped']}", flush=True)
+                continue
+            record = {"benchmark": name, "params": list(params), **result, **info}
+            records.append(record)
+
+            before = previous.get((name, json.dumps(record["params"])))
+            change = ""
+            key = "peakmem" if "peakmem" in result else "median"
+            if before is not None and before.get(key):
+                ratio = result[key] / before[key]
+                flag = "  regression" if ratio > 1 + args.threshold else "  improvement" if ratio < 1 / (1 + args.threshold) else ""
+                regressions += flag == "  regression"
+                change = f"  {format_value(before)} -> x{ratio:.2f}{flag}"
+            print(f"{label:<80} {format_value(result):>10}{change}", flush=True)
+
+    if records and not args.no_save:
+        os.makedirs(os.path.dirname(args.history), exist_ok=True)
+        with open(args.history, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+    print(f"{len(records)} results, {regressions} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Synthetic data generators, so that the benchmarks run offline with data of the same shape as the examples.
+"""
+import energydatamodel as edm
+import gymnasium as gym
+import numpy as np
+import pandas as pd
+
+import enflow as ef
+
+GEFCOM_INPUTS = ['VAR134', 'VAR157', 'VAR164', 'VAR165', 'VAR166', 'VAR167', 'VAR169', 'VAR175', 'VAR178', 'VAR228', 'VAR78', 'VAR79']
+SITES = ["Site1", "Site2", "Site3"]
+
+
+def solar_profile(times):
+    """
+    A clear-sky like daily profile between 0 and 1, peaking at noon.
+    """
+    hours = times.hour + times.minute / 60
+    return np.clip(np.sin((np.asarray(hours) - 6) / 12 * np.pi), 0, None)
+
+
+def gefcom_frame(start="2012-04-01 01:00", end="2014-07-01 00:00", sites=SITES, seed=0):
+    """
+    Hourly data shaped like gefcom2014-solar.csv: a (ref_datetime, valid_datetime) row index and (site, variable)
+    columns with the GEFCom2014 input variables and the normalized Power.
+    """
+    rng = np.random.default_rng(seed)
+    valid = pd.date_range(start, end, freq="h")
+    index = pd.MultiIndex.from_arrays([valid.floor("D"), valid], names=["ref_datetime", "valid_datetime"])
+    columns = pd.MultiIndex.from_product([sites, GEFCOM_INPUTS + ["Power"]])
+
+    data = rng.normal(size=(len(valid), len(sites), len(GEFCOM_INPUTS) + 1))
+    profile = solar_profile(valid)[:, np.newaxis]
+    data[:, :, -1] = np.clip(profile * rng.uniform(0.3, 1.0, size=(len(valid), len(sites))), 0, 1)
+    return pd.DataFrame(data.reshape(len(valid), -1), index=index, columns=columns)
+
+
+def gefcom_scores(n_tasks=15, n_teams=10, seed=0):
+    """
+    A table of pinball losses per task and team, shaped like gefcom2014-solar-scores.csv.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.uniform(0.01, 0.05, size=(n_tasks, n_teams)),
+                        index=[f"Task {i + 1}" for i in range(n_tasks)],
+                        columns=[f"Team {i + 1}" for i in range(n_teams)])
+
+
+def gefcom_spaces(n_quantiles=99, sites=SITES):
+    """
+    The state and action spaces of the GEFCom2014 solar problem.
+    """
+    state_space = ef.DataFrameSpace({site: {
+        name: gym.spaces.Box(low=-np.inf if name != "Power" else 0, high=np.inf if name != "Power" else 1, shape=(1,), dtype=np.float32)
+        for name in ("U10", "V10", "U100", "V100", "Power")
+    } for site in sites})
+    action_space = ef.DataFrameSpace({site: {
+        "Quantile_forecast": gym.spaces.Box(low=0, high=1, shape=(n_quantiles,))
+    } for site in sites})
+    return state_space, action_space
+
+
+def quantile_forecasts(n_rows, n_quantiles, sites=SITES, seed=0):
+    """
+    Targets and sorted quantile forecasts as DataFrames with (site, quantile) columns.
+    :return: (y_true, y_preds, quantiles)
+    """
+    rng = np.random.default_rng(seed)
+    quantiles = np.linspace(0, 1, n_quantiles + 2)[1:-1]
+    index = pd.date_range("2013-04-01", periods=n_rows, freq="h")
+    y_true = pd.DataFrame(rng.uniform(size=(n_rows, len(sites))), index=index, columns=sites)
+    preds = np.sort(rng.uniform(size=(n_rows, len(sites), n_quantiles)), axis=-1)
+    columns = pd.MultiIndex.from_product([sites, [f"quantile_{round(q * 100)}" for q in quantiles]])
+    y_preds = pd.DataFrame(preds.reshape(n_rows, -1), index=index, columns=columns)
+    return y_true, y_preds, quantiles
+
+
+def solar_battery_frame(hours, start="2023-01-01", seed=0):
+    """
+    Hourly data of a building with PV and a battery, in the column order that PV_BESS_LP_solver expects: time,
+    demand, PV production, wholesale price and retail price.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start, periods=hours, freq="h", tz="UTC")
+    wholesale = 0.5 + 0.3 * np.sin(2 * np.pi * np.arange(hours) / 24) + rng.normal(scale=0.05, size=hours)
+    return pd.DataFrame({
+        "Time": times,
+        "EnergyDemand": 1.0 + 0.5 * rng.uniform(size=hours),
+        "PVProduction": 3.0 * solar_profile(times) * rng.uniform(0.5, 1.0, size=hours),
+        "Wholesale prices": wholesale,
+        "Retail prices": wholesale + 0.2,
+    })
+
+
+def solar_battery_system():
+    """
+    The energy system of the solar_battery examples: a PV system and a battery.
+    """
+    pv = edm.PVSystem(name="pv", capacity=3)
+    battery = edm.Battery(name="battery", storage_capacity=10, min_soc=0.1, max_charge=0.5, max_discharge=0.5,
+                          charge_efficiency=0.95, discharge_efficiency=0.95)
+    return edm.EnergySystem(name="building", assets=[pv, battery])
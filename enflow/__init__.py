@@ -9,7 +9,8 @@ from .assets.battery import Battery
 from .assets.heatpump import HeatPump
 from .assets.energycollection import Site, EnergyCommunity, Portfolio
 
-from .spaces.base import BaseSpace
+from .spaces.base import BaseSpace, fast_space
+from .spaces.batch import SpaceBatch
 from .spaces.input import InputSpace, StateSpace
 from .spaces.output import OutputSpace, ActionSpace
 from .spaces.dataframe import DataFrameSpace
@@ -24,6 +25,8 @@ from .problems.objective import Objective
 from .problems.problem import Problem
 
 from .problems.objective import PinballLoss
+
+from .experiments.experiment import Experiment, BatchExperiment
 #from energydatamodel.pv import PVArray
 
 from .utils.loader import list_problems, load_problem
@@ -7,12 +7,15 @@ import numpy as np
 import pandas as pd
 import energydatamodel as edm
 
+from enflow.spaces.batch import SpaceBatch
+
 
 @dataclass
 class BaseVector:
     """
     Base vector.
     """
+    __slots__ = ()
 
     @property
     def vector(self) -> np.ndarray:
@@ -40,15 +43,31 @@ class BaseVector:
         state = cls(**attribute_values)
         return state
 
+    @classmethod
+    def batch(cls, instances, dtype=np.float64) -> SpaceBatch:
+        """ 
+        Stack instances into a :class:`SpaceBatch` backed by one 2-D array. 
+        """
+
+        return SpaceBatch.from_instances(cls, instances, dtype=dtype)
+
+    @classmethod
+    def batch_from_vectors(cls, state_vectors) -> SpaceBatch:
+        """ 
+        Create a :class:`SpaceBatch` from a 2-D :class:numpy.array with one vector per row. 
+        """
+
+        return SpaceBatch.from_array(cls, state_vectors)
+
 
 @dataclass
 class BaseState(BaseVector):
-    pass
+    __slots__ = ()
 
 
 @dataclass
 class BaseAction(BaseVector):
-    pass
+    __slots__ = ()
 
 
 @dataclass
@@ -13,10 +13,19 @@ import matplotlib.pyplot as plt
 #df_scores = pd.read_csv("gefcom2014-solar-scores.csv", index_col=0)
 parent_dir = Path.cwd().parent
 
-with importlib.resources.path("enflow.examples.data", "gefcom2014-solar.csv") as path:
-    df_data = pd.read_csv(path, index_col=[0, 1], parse_dates=True, header=[0, 1])
-with importlib.resources.path("enflow.examples.data", "gefcom2014-solar-scores.csv") as path:
-    df_scores = pd.read_csv(path, index_col=0)
+
+def load_data(data_path=None, scores_path=None):
+    """
+    Read the GEFCom2014 solar data and scores, by default those shipped with enflow. The data is read when a problem
+    is created, not when this module is imported, e.g. by :func:`list_problems`.
+    :param data_path: str, optional path of a CSV file to read the data from instead.
+    :param scores_path: str, optional path of a CSV file to read the scores from instead.
+    """
+    with importlib.resources.path("enflow.examples.data", "gefcom2014-solar.csv") as path:
+        df_data = pd.read_csv(data_path or path, index_col=[0, 1], parse_dates=True, header=[0, 1])
+    with importlib.resources.path("enflow.examples.data", "gefcom2014-solar-scores.csv") as path:
+        df_scores = pd.read_csv(scores_path or path, index_col=0)
+    return df_data, df_scores
 
 
 #df_data = pd.read_csv(os.path.join(parent_dir, 'data', 'gefcom2014-solar.csv'),
@@ -47,10 +56,12 @@ pvsystem_3 = ef.PVSystem(name="Site3",
 
 portfolio = ef.Portfolio(name="Portfolio", assets=[pvsystem_1, pvsystem_2, pvsystem_3])
 
-dataset = ef.Dataset(name="gefcom2024-solar",
-                     description="Data provided by the organisers of HEFTCom2024. Participants are free to use additional external data.",
-                     collection=portfolio,
-                     data={"data_gefcom2014_solar": df_data, "scores_gefcom2014_solar": df_scores})
+
+def make_dataset(df_data, df_scores):
+    return ef.Dataset(name="gefcom2024-solar",
+                      description="Data provided by the organisers of HEFTCom2024. Participants are free to use additional external data.",
+                      collection=portfolio,
+                      data={"data_gefcom2014_solar": df_data, "scores_gefcom2014_solar": df_scores})
 
 state_space = ef.DataFrameSpace({asset.name: {
     'U10': gym.spaces.Box(low=-np.inf, high=np.inf, shape=(1,), dtype=np.float32),
@@ -62,7 +73,7 @@ state_space = ef.DataFrameSpace({asset.name: {
 
 
 make_action_space = lambda n_quantiles: ef.DataFrameSpace({asset.name: {
-    f"Quantile_forecast_{i+1}": gym.spaces.Box(low=0, high=1, shape=(1,)) for i in range(n_quantiles)
+    "Quantile_forecast": gym.spaces.Box(low=0, high=1, shape=(n_quantiles,))
 } for asset in portfolio.assets})
 
 
@@ -110,6 +121,13 @@ class GEFCom2014SolarEnv(gym.Env):
 
         self.n_steps = len(self.test)
 
+    def get_state(self):
+        # Only the cursor changes during an episode, the data is not checkpointed
+        return {"idx_counter": self.idx_counter}
+
+    def set_state(self, state):
+        self.idx_counter = state["idx_counter"]
+
     def reset(self):
         self.idx_counter = 0
         initial_dataframe = self.data.loc[(self.data.index.get_level_values('valid_datetime') >= self.train[self.idx_counter][0]) &
@@ -275,6 +293,7 @@ def list_problem_variants():
     return ["simple", "full"]
 
 def get_problem_simple():
+    dataset = make_dataset(*load_data())
     action_space = make_action_space(3)
     env = GEFCom2014SolarEnv(dataset=dataset, state_space=state_space, action_space=action_space)
 
@@ -53,7 +53,7 @@ state_space = ef.DataFrameSpace({asset.name: {
 n_quantiles = 99
 
 action_space = ef.DataFrameSpace({asset.name: {
-    f"Quantile_forecast_{i+1}": gym.spaces.Box(low=0, high=1, shape=(1,)) for i in range(n_quantiles)
+    "Quantile_forecast": gym.spaces.Box(low=0, high=1, shape=(n_quantiles,))
 } for asset in portfolio.assets})
 
 
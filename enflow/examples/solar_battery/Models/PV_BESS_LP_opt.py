@@ -2,7 +2,8 @@ import gymnasium as gym
 import enflow as ef
 import energydatamodel as edm
 from enflow.problems.dataset import Dataset
-from enflow.problems.objective import Objective
+from enflow.problems.objective import EnergyCostObjective
+from enflow.experiments import TrajectoryRecorder
 
 import pandas as pd
 import datetime
@@ -483,19 +484,7 @@ def PV_BESS_LP(
 
     env = PVenv(dataset=dataset)
 
-    class obj(Objective):
-
-        def obj_function(self, grid_trade, wholesale_price, retail_price):
-            #SELLING energy to the grid
-            if grid_trade>0:
-                costs = - grid_trade*wholesale_price
-
-            #BUYING energy from the grid
-            if grid_trade<=0:
-                costs = - grid_trade*retail_price 
-            return costs
-        
-    calculate = obj()
+    calculate = EnergyCostObjective()
 
 
     class Agent(ef.Agent):
@@ -507,17 +496,7 @@ def PV_BESS_LP(
     agent = Agent()
 
 
-    data = {
-        'Time': pd.to_datetime([]),
-        'BESS_SOC': [],
-        'PV Production': [],
-        'Trade': [],
-        'Load': [],
-        'Battery_flow': [],
-        'Costs': []
-    }
-
-    df = pd.DataFrame(data)
+    recorder = TrajectoryRecorder(columns=["Time", "BESS_SOC", "PV Production", "Trade", "Load", "Battery_flow", "Costs"])
 
     done = False
     initial_state, initial_exogeneous, initial_action, observation, prediction, objective_function = env.reset()
@@ -534,16 +513,18 @@ def PV_BESS_LP(
         next_state, exogeneous, done = env.step()
         action = agent.act(next_state, observation, exogeneous, time, prediction)
         observation = env.new_observation(action)
-        costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"], exogeneous["retail_price"])
+        costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"], exogeneous["retail_price"])
 
 
-        df.loc[time, "Time"]=database.loc[time, "Time"]
-        df.loc[time, "BESS_SOC"] = observation["BESS_SOC"]
-        df.loc[time, "PV Production"] = next_state["solar_power"]
-        df.loc[time, "Trade"] = observation["Trade"]
-        df.loc[time, "Load"] = next_state["energy_consumption"]
-        df.loc[time, "Battery_flow"]=action
-        df.loc[time, "Costs"]=costs
+        recorder.record({
+            "Time": database.loc[time, "Time"],
+            "BESS_SOC": observation["BESS_SOC"],
+            "PV Production": next_state["solar_power"],
+            "Trade": observation["Trade"],
+            "Load": next_state["energy_consumption"],
+            "Battery_flow": action,
+            "Costs": costs,
+        })
 
         total_PV_Production += next_state["solar_power"]
         total_Load += next_state["energy_consumption"]
@@ -554,6 +535,8 @@ def PV_BESS_LP(
 
         time=time+1
 
+    df = recorder.to_frame()
+
     #KPI
     SolarFraction = total_PV_Production/total_Load
     SelfConsumption = (total_PV_Production-total_export)/total_PV_Production
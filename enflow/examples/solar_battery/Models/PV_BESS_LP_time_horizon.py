@@ -2,7 +2,8 @@ import gymnasium as gym
 import enflow as ef
 import energydatamodel as edm
 from enflow.problems.dataset import Dataset
-from enflow.problems.objective import Objective
+from enflow.problems.objective import EnergyCostObjective
+from enflow.experiments import TrajectoryRecorder
 
 import numpy as np
 import pandas as pd
@@ -156,19 +157,7 @@ def PV_BESS_LP_Time_horizon_v2(
 
     env = PVenv(dataset=dataset)
 
-    class obj(Objective):
-
-        def obj_function(self, grid_trade, wholesale_price, retail_price):
-            #SELLING energy to the grid
-            if grid_trade>0:
-                costs = - grid_trade*wholesale_price
-
-            #BUYING energy from the grid
-            if grid_trade<=0:
-                costs = - grid_trade*retail_price 
-            return costs
-        
-    calculate = obj()
+    calculate = EnergyCostObjective()
 
 
     class Agent(ef.Agent):
@@ -210,17 +199,7 @@ def PV_BESS_LP_Time_horizon_v2(
     agent = Agent()
 
 
-    data = {
-        'Time': pd.to_datetime([]),
-        'BESS_SOC': [],
-        'PV Production': [],
-        'Trade': [],
-        'Load': [],
-        'Battery_flow': [],
-        'Costs': []
-    }
-
-    df = pd.DataFrame(data)
+    recorder = TrajectoryRecorder(columns=["Time", "BESS_SOC", "PV Production", "Trade", "Load", "Battery_flow", "Costs"])
 
     done = False
     initial_state, initial_exogeneous, initial_action, observation = env.reset()
@@ -245,15 +224,17 @@ def PV_BESS_LP_Time_horizon_v2(
                 else:
                     observation = env.last_observation(action[i])
 
-                costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"].loc[i], exogeneous["retail_price"].loc[i])
-
-                df.loc[time, "Time"]=next_state["time"].loc[i]
-                df.loc[time, "BESS_SOC"] = observation["BESS_SOC"]
-                df.loc[time, "PV Production"] = next_state["solar_power"].loc[i]
-                df.loc[time, "Trade"] = observation["Trade"]
-                df.loc[time, "Load"] = next_state["energy_consumption"].loc[i]
-                df.loc[time, "Battery_flow"]=action[i]
-                df.loc[time, "Costs"]=costs
+                costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"].loc[i], exogeneous["retail_price"].loc[i])
+
+                recorder.record({
+                    "Time": next_state["time"].loc[i],
+                    "BESS_SOC": observation["BESS_SOC"],
+                    "PV Production": next_state["solar_power"].loc[i],
+                    "Trade": observation["Trade"],
+                    "Load": next_state["energy_consumption"].loc[i],
+                    "Battery_flow": action[i],
+                    "Costs": costs,
+                })
                 
                 total_PV_Production += next_state["solar_power"].loc[i]
                 total_Load += next_state["energy_consumption"].loc[i]
@@ -266,16 +247,18 @@ def PV_BESS_LP_Time_horizon_v2(
         else:
             action = agent.act(next_state, exogeneous, observation['BESS_SOC'])
             observation = env.new_observation(action)
-            costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"].loc[0], exogeneous["retail_price"].loc[0])
-
-
-            df.loc[time, "Time"]=next_state["time"].loc[0]
-            df.loc[time, "BESS_SOC"] = observation["BESS_SOC"]
-            df.loc[time, "PV Production"] = next_state["solar_power"].loc[0]
-            df.loc[time, "Trade"] = observation["Trade"]
-            df.loc[time, "Load"] = next_state["energy_consumption"].loc[0]
-            df.loc[time, "Battery_flow"]=action
-            df.loc[time, "Costs"]=costs
+            costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"].loc[0], exogeneous["retail_price"].loc[0])
+
+
+            recorder.record({
+                "Time": next_state["time"].loc[0],
+                "BESS_SOC": observation["BESS_SOC"],
+                "PV Production": next_state["solar_power"].loc[0],
+                "Trade": observation["Trade"],
+                "Load": next_state["energy_consumption"].loc[0],
+                "Battery_flow": action,
+                "Costs": costs,
+            })
             
             total_PV_Production += next_state["solar_power"].loc[0]
             total_Load += next_state["energy_consumption"].loc[0]
@@ -286,6 +269,8 @@ def PV_BESS_LP_Time_horizon_v2(
 
             time=env.idx_counter
 
+    df = recorder.to_frame()
+
     #KPI
     SolarFraction = total_PV_Production/total_Load
     SelfConsumption = (total_PV_Production-total_export)/total_PV_Production
@@ -442,21 +427,7 @@ def PV_BESS_LP_Time_horizon(
     env = PVenv(dataset=dataset)
 
 
-    class obj(Objective):
-
-        def obj_function(self, grid_trade, wholesale_price, retail_price):
-            costs=np.zeros(len(grid_trade))
-            for i in range(len(grid_trade)):
-                #SELLING energy to the grid
-                if grid_trade[i]>0:
-                    costs[i] = - grid_trade[i]*wholesale_price[i]
-
-                #BUYING energy from the grid
-                if grid_trade[i]<=0:
-                    costs[i] = - grid_trade[i]*retail_price[i] 
-            return costs
-        
-    calculate = obj()
+    calculate = EnergyCostObjective()
 
 
     class Agent(ef.Agent):
@@ -484,17 +455,7 @@ def PV_BESS_LP_Time_horizon(
 
 
 
-    data = {
-        'Time': pd.to_datetime([]),
-        'BESS_SOC': [],
-        'PV Production': [],
-        'Trade': [],
-        'Load': [],
-        'Battery_flow': [],
-        'Costs': []
-    }
-
-    df = pd.DataFrame(data)
+    recorder = TrajectoryRecorder(columns=["Time", "BESS_SOC", "PV Production", "Trade", "Load", "Battery_flow", "Costs"])
 
     done = False
     initial_state, initial_exogeneous, initial_action, observation, initial_soc_next_state = env.reset()
@@ -511,29 +472,18 @@ def PV_BESS_LP_Time_horizon(
         next_state, exogeneous, done = env.step()
         action, new_soc = agent.act(next_state, exogeneous, initial_soc=initial_soc_next_state)
         observation, initial_soc_next_state = env.new_observation(action, new_soc)
-        costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"].reset_index(drop=True), exogeneous["retail_price"].reset_index(drop=True))
-
-        data = {
-        'Time': pd.to_datetime([]),
-        'BESS_SOC': [],
-        'PV Production': [],
-        'Trade': [],
-        'Load': [],
-        'Battery_flow': [],
-        'Costs': []
-        }
-
-        ResultsDF = pd.DataFrame(data)
-
-        ResultsDF["Time"]=next_state["time"].reset_index(drop=True)
-        ResultsDF["BESS_SOC"] = observation["BESS_SOC"]
-        ResultsDF["PV Production"] = next_state["solar_power"].reset_index(drop=True)
-        ResultsDF["Trade"] = observation["Trade"]
-        ResultsDF["Load"] = next_state["energy_consumption"].reset_index(drop=True)
-        ResultsDF["Battery_flow"]=action
-        ResultsDF["Costs"]=costs
-
-        df = pd.concat([df, ResultsDF], ignore_index=True)
+        costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"].reset_index(drop=True), exogeneous["retail_price"].reset_index(drop=True),
+                                 time_axis=0)
+
+        recorder.extend({
+            "Time": next_state["time"],
+            "BESS_SOC": observation["BESS_SOC"],
+            "PV Production": next_state["solar_power"],
+            "Trade": observation["Trade"],
+            "Load": next_state["energy_consumption"],
+            "Battery_flow": action,
+            "Costs": costs,
+        })
 
         total_PV_Production += sum(next_state["solar_power"])
         total_Load += sum(next_state["energy_consumption"])
@@ -547,6 +497,8 @@ def PV_BESS_LP_Time_horizon(
         print(time)
         time=time+time_horizon
 
+    df = recorder.to_frame()
+
     #KPI
     SolarFraction = total_PV_Production/total_Load
     SelfConsumption = (total_PV_Production-total_export)/total_PV_Production
@@ -703,19 +655,7 @@ def PV_BESS_LP_Time_horizon_v2_OLD( #Not working anymore
 
     env = PVenv(dataset=dataset)
 
-    class obj(Objective):
-
-        def obj_function(self, grid_trade, wholesale_price, retail_price):
-            #SELLING energy to the grid
-            if grid_trade>0:
-                costs = - grid_trade*wholesale_price
-
-            #BUYING energy from the grid
-            if grid_trade<=0:
-                costs = - grid_trade*retail_price 
-            return costs
-        
-    calculate = obj()
+    calculate = EnergyCostObjective()
 
 
     class Agent(ef.Agent):
@@ -757,17 +697,7 @@ def PV_BESS_LP_Time_horizon_v2_OLD( #Not working anymore
     agent = Agent()
 
 
-    data = {
-        'Time': pd.to_datetime([]),
-        'BESS_SOC': [],
-        'PV Production': [],
-        'Trade': [],
-        'Load': [],
-        'Battery_flow': [],
-        'Costs': []
-    }
-
-    df = pd.DataFrame(data)
+    recorder = TrajectoryRecorder(columns=["Time", "BESS_SOC", "PV Production", "Trade", "Load", "Battery_flow", "Costs"])
 
     done = False
     initial_state, initial_exogeneous, initial_action, observation = env.reset()
@@ -793,15 +723,17 @@ def PV_BESS_LP_Time_horizon_v2_OLD( #Not working anymore
                 else:
                     observation = env.last_observation(action[i])
 
-                costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"].loc[i], exogeneous["retail_price"].loc[i])
-
-                df.loc[time, "Time"]=next_state["time"].loc[i]
-                df.loc[time, "BESS_SOC"] = observation["BESS_SOC"]
-                df.loc[time, "PV Production"] = next_state["solar_power"].loc[i]
-                df.loc[time, "Trade"] = observation["Trade"]
-                df.loc[time, "Load"] = next_state["energy_consumption"].loc[i]
-                df.loc[time, "Battery_flow"]=action[i]
-                df.loc[time, "Costs"]=costs
+                costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"].loc[i], exogeneous["retail_price"].loc[i])
+
+                recorder.record({
+                    "Time": next_state["time"].loc[i],
+                    "BESS_SOC": observation["BESS_SOC"],
+                    "PV Production": next_state["solar_power"].loc[i],
+                    "Trade": observation["Trade"],
+                    "Load": next_state["energy_consumption"].loc[i],
+                    "Battery_flow": action[i],
+                    "Costs": costs,
+                })
                 
                 total_PV_Production += next_state["solar_power"].loc[i]
                 total_Load += next_state["energy_consumption"].loc[i]
@@ -814,16 +746,18 @@ def PV_BESS_LP_Time_horizon_v2_OLD( #Not working anymore
         else:
             action = agent.act(next_state, exogeneous, observation['BESS_SOC'])
             observation = env.new_observation(action)
-            costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"].loc[0], exogeneous["retail_price"].loc[0])
-
-
-            df.loc[time, "Time"]=next_state["time"].loc[0]
-            df.loc[time, "BESS_SOC"] = observation["BESS_SOC"]
-            df.loc[time, "PV Production"] = next_state["solar_power"].loc[0]
-            df.loc[time, "Trade"] = observation["Trade"]
-            df.loc[time, "Load"] = next_state["energy_consumption"].loc[0]
-            df.loc[time, "Battery_flow"]=action
-            df.loc[time, "Costs"]=costs
+            costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"].loc[0], exogeneous["retail_price"].loc[0])
+
+
+            recorder.record({
+                "Time": next_state["time"].loc[0],
+                "BESS_SOC": observation["BESS_SOC"],
+                "PV Production": next_state["solar_power"].loc[0],
+                "Trade": observation["Trade"],
+                "Load": next_state["energy_consumption"].loc[0],
+                "Battery_flow": action,
+                "Costs": costs,
+            })
             
             total_PV_Production += next_state["solar_power"].loc[0]
             total_Load += next_state["energy_consumption"].loc[0]
@@ -834,6 +768,8 @@ def PV_BESS_LP_Time_horizon_v2_OLD( #Not working anymore
 
             time=env.idx_counter
 
+    df = recorder.to_frame()
+
     #KPI
     SolarFraction = total_PV_Production/total_Load
     SelfConsumption = (total_PV_Production-total_export)/total_PV_Production
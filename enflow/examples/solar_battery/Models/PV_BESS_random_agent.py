@@ -2,7 +2,8 @@ import gymnasium as gym
 import enflow as ef
 import energydatamodel as edm
 from enflow.problems.dataset import Dataset
-from enflow.problems.objective import Objective
+from enflow.problems.objective import EnergyCostObjective
+from enflow.experiments import TrajectoryRecorder
 
 import numpy as np
 import pandas as pd
@@ -114,19 +115,7 @@ def PV_BESS_random_agent(
     env = PVenv(dataset=dataset)
 
 
-    class obj(Objective):
-
-        def obj_function(self, grid_trade, wholesale_price, retail_price):
-            #SELLING energy to the grid
-            if grid_trade>0:
-                costs = - grid_trade*wholesale_price
-
-            #BUYING energy from the grid
-            if grid_trade<=0:
-                costs = - grid_trade*retail_price 
-            return costs
-        
-    calculate = obj()
+    calculate = EnergyCostObjective()
 
 
     class Agent(ef.Agent):
@@ -155,17 +144,7 @@ def PV_BESS_random_agent(
     agent = Agent()
 
 
-    data = {
-        'Time': pd.to_datetime([]),
-        'BESS_SOC': [],
-        'PV Production': [],
-        'Trade': [],
-        'Load': [],
-        'Battery_flow': [],
-        'Costs': []
-    }
-
-    df = pd.DataFrame(data)
+    recorder = TrajectoryRecorder(columns=["Time", "BESS_SOC", "PV Production", "Trade", "Load", "Battery_flow", "Costs"])
 
     done = False
     initial_state, initial_exogeneous, initial_action, observation = env.reset()
@@ -182,16 +161,18 @@ def PV_BESS_random_agent(
         next_state, exogeneous, done = env.step()
         action = agent.act(next_state, observation)
         observation = env.new_observation(action)
-        costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"], exogeneous["retail_price"])
+        costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"], exogeneous["retail_price"])
 
 
-        df.loc[time, "Time"]=database.loc[time, "Time"]
-        df.loc[time, "BESS_SOC"] = observation["BESS_SOC"]
-        df.loc[time, "PV Production"] = next_state["solar_power"]
-        df.loc[time, "Trade"] = observation["Trade"]
-        df.loc[time, "Load"] = next_state["energy_consumption"]
-        df.loc[time, "Battery_flow"]=action
-        df.loc[time, "Costs"]=costs
+        recorder.record({
+            "Time": database.loc[time, "Time"],
+            "BESS_SOC": observation["BESS_SOC"],
+            "PV Production": next_state["solar_power"],
+            "Trade": observation["Trade"],
+            "Load": next_state["energy_consumption"],
+            "Battery_flow": action,
+            "Costs": costs,
+        })
 
         total_PV_Production += next_state["solar_power"]
         total_Load += next_state["energy_consumption"]
@@ -202,6 +183,8 @@ def PV_BESS_random_agent(
 
         time=time+1
 
+    df = recorder.to_frame()
+
     #KPI
     SolarFraction = total_PV_Production/total_Load
     SelfConsumption = (total_PV_Production-total_export)/total_PV_Production
@@ -324,19 +307,7 @@ def PV_BESS_random_agent_v2(
     env = PVenv(dataset=dataset)
 
 
-    class obj(Objective):
-
-        def obj_function(self, grid_trade, wholesale_price, retail_price):
-            #SELLING energy to the grid
-            if grid_trade>0:
-                costs = - grid_trade*wholesale_price
-
-            #BUYING energy from the grid
-            if grid_trade<=0:
-                costs = - grid_trade*retail_price 
-            return costs
-        
-    calculate = obj()
+    calculate = EnergyCostObjective()
 
 
     class Agent(ef.Agent):
@@ -355,17 +326,7 @@ def PV_BESS_random_agent_v2(
     agent = Agent()
 
 
-    data = {
-        'Time': pd.to_datetime([]),
-        'BESS_SOC': [],
-        'PV Production': [],
-        'Trade': [],
-        'Load': [],
-        'Battery_flow': [],
-        'Costs': []
-    }
-
-    df = pd.DataFrame(data)
+    recorder = TrajectoryRecorder(columns=["Time", "BESS_SOC", "PV Production", "Trade", "Load", "Battery_flow", "Costs"])
 
     done = False
     initial_state, initial_exogeneous, initial_action, observation = env.reset()
@@ -382,16 +343,18 @@ def PV_BESS_random_agent_v2(
         next_state, exogeneous, done = env.step()
         action = agent.act(next_state, observation)
         observation = env.new_observation(action)
-        costs = calculate.obj_function(observation["Trade"], exogeneous["wholesale_price"], exogeneous["retail_price"])
+        costs = calculate.update(observation["Trade"], exogeneous["wholesale_price"], exogeneous["retail_price"])
 
 
-        df.loc[time, "Time"]=database.loc[time, "Time"]
-        df.loc[time, "BESS_SOC"] = observation["BESS_SOC"]
-        df.loc[time, "PV Production"] = next_state["solar_power"]
-        df.loc[time, "Trade"] = observation["Trade"]
-        df.loc[time, "Load"] = next_state["energy_consumption"]
-        df.loc[time, "Battery_flow"]=action
-        df.loc[time, "Costs"]=costs
+        recorder.record({
+            "Time": database.loc[time, "Time"],
+            "BESS_SOC": observation["BESS_SOC"],
+            "PV Production": next_state["solar_power"],
+            "Trade": observation["Trade"],
+            "Load": next_state["energy_consumption"],
+            "Battery_flow": action,
+            "Costs": costs,
+        })
 
         total_PV_Production += next_state["solar_power"]
         total_Load += next_state["energy_consumption"]
@@ -402,6 +365,8 @@ def PV_BESS_random_agent_v2(
 
         time=time+1
 
+    df = recorder.to_frame()
+
     #KPI
     SolarFraction = total_PV_Production/total_Load
     SelfConsumption = (total_PV_Production-total_export)/total_PV_Production
@@ -0,0 +1,6 @@
+from .experiment import Experiment, BatchExperiment, ExperimentResult, Transition
+from .benchmark import ExperimentGrid, GridCell, ResultsStore, get_problem, run_experiment
+from .recorder import TrajectoryRecorder
+from .instrumentation import Instrumentation, InstrumentedModel
+from .checkpoint import Checkpoint
+from .async_experiment import AsyncExperiment, LatencyModel
@@ -0,0 +1,164 @@
+import asyncio
+import copy
+import inspect
+
+import numpy as np
+
+from enflow.experiments.experiment import ExperimentResult, action_phase, get_action, reset_env, step_env, supports_streaming
+from enflow.experiments.instrumentation import null_phase
+
+
+async def get_action_async(model, observation):
+    """
+    Get the action of an agent, or the prediction of a predictor, awaiting it if act or predict is a coroutine.
+    """
+    action = get_action(model, observation)
+    if inspect.isawaitable(action):
+        action = await action
+    return action
+
+
+class LatencyModel:
+    """
+    A local stand-in for a model behind a model-serving process, to run and benchmark an :class:`AsyncExperiment`
+    without a server. Its act is an ``async def`` that gets the action of the wrapped model and returns it after
+    a simulated round trip, awaited with asyncio.sleep, so that the requests of concurrent episodes overlap as they
+    would with a remote model.
+    """
+
+    def __init__(self, model, latency=0.01, jitter=0.0, seed=None):
+        """
+        :param model: The wrapped model, an :class:`Agent` or :class:`Predictor` with a synchronous act or predict.
+        :param latency: float, the latency of each call in seconds.
+        :param jitter: float, the maximum random latency in seconds added to each call.
+        :param seed: int, optional seed of the jitter.
+        """
+        assert latency >= 0 and jitter >= 0, "Latency and jitter must be non-negative."
+        self.model = model
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = np.random.default_rng(seed)
+        self.n_calls = 0
+
+    async def act(self, observation):
+        self.n_calls += 1
+        action = get_action(self.model, observation)
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        await asyncio.sleep(delay)
+        return action
+
+
+class AsyncExperiment:
+    """
+    Run many independent episodes concurrently with a model whose act or predict is an ``async def``, e.g. an
+    agent that requests its actions from a model-serving process.
+
+    The episodes, e.g. one per seed or site, are run by max_concurrency worker tasks. Each worker runs one episode
+    at a time and awaits the action of each step before stepping the environment, so the steps of an episode stay
+    in order, while the requests of up to max_concurrency episodes are in flight at once. An episode's environment
+    is created when a worker starts it, so no more than max_concurrency environments are live. Models with a
+    synchronous act or predict are called directly, which blocks the other episodes during the call.
+
+    Each episode evaluates a copy of the objective of the problem, so that each result has its own score.
+    """
+
+    def __init__(self, problem, model, n_episodes=None, envs=None, max_concurrency=8, instrumentation=None):
+        """
+        :param problem: The :class:`Problem` with the environment and objective.
+        :param model: The model, an :class:`Agent` or :class:`Predictor`, with an async or sync act or predict.
+        :param n_episodes: int, the number of episodes to run on copies of the environment of the problem.
+        :param envs: list of environments to run one episode each on, instead of copies of the environment.
+        :param max_concurrency: int, the maximum number of episodes, and so of pending model calls, at once.
+        :param instrumentation: :class:`Instrumentation`, optional, to time the phases of each episode as in
+                                :class:`Experiment`. The model phase includes the time spent waiting for a reply.
+        """
+        assert (n_episodes is None) != (envs is None), "Either n_episodes or envs must be given."
+        assert max_concurrency >= 1, "Max concurrency must be at least 1."
+        self.problem = problem
+        self.model = model
+        self.envs = list(envs) if envs is not None else None
+        self.n_episodes = len(self.envs) if envs is not None else n_episodes
+        self.max_concurrency = max_concurrency
+        self.instrumentation = instrumentation
+
+    def make_env(self, i):
+        """
+        Get the environment of episode i.
+        """
+        if self.envs is not None:
+            return self.envs[i]
+        return copy.deepcopy(self.problem.environment)
+
+    async def run_episode(self, i, max_steps=None, seed=None):
+        """
+        Run episode i.
+        :return: ExperimentResult
+        """
+        env = self.make_env(i)
+        objective = copy.deepcopy(self.problem.objective) if self.problem is not None else None
+        streaming = supports_streaming(objective)
+        if streaming:
+            objective.reset()
+        phase = self.instrumentation.phase if self.instrumentation is not None else null_phase
+        model_phase = action_phase(self.model)
+
+        with phase("env.reset"):
+            observation = reset_env(env, seed)
+        rewards = []
+        n_steps, n_targets = 0, 0
+        done = False
+        while not done and (max_steps is None or n_steps < max_steps):
+            with phase(model_phase):
+                action = await get_action_async(self.model, observation)
+            with phase("env.step"):
+                transition = step_env(env, action)
+            if transition.reward is not None:
+                rewards.append(transition.reward)
+            if transition.target is not None and streaming:
+                with phase("objective.update"):
+                    objective.update(transition.target, action)
+                n_targets += 1
+            observation, done = transition.observation, transition.done
+            n_steps += 1
+
+        score = None
+        if n_targets:
+            with phase("objective.result"):
+                score = objective.result()
+        return ExperimentResult(np.asarray(rewards, dtype=float), score, n_steps)
+
+    async def run_async(self, max_steps=None, seeds=None):
+        """
+        Run all episodes in the running event loop.
+        :param max_steps: int, optional maximum number of steps per episode.
+        :param seeds: list of int, optional seeds to reset the environments with, one per episode.
+        :return: list of ExperimentResult, one per episode, in the order of the episodes.
+        """
+        seeds = seeds if seeds is not None else [None] * self.n_episodes
+        assert len(seeds) == self.n_episodes, "There must be one seed per episode."
+        results = [None] * self.n_episodes
+        queue = asyncio.Queue()
+        for i in range(self.n_episodes):
+            queue.put_nowait(i)
+
+        async def worker():
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[i] = await self.run_episode(i, max_steps, seeds[i])
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_concurrency, self.n_episodes))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return results
+
+    def run(self, max_steps=None, seeds=None):
+        """
+        Run all episodes in a new event loop, see :meth:`run_async`.
+        """
+        return asyncio.run(self.run_async(max_steps, seeds))
@@ -0,0 +1,281 @@
+import itertools
+import multiprocessing
+import os
+import time
+import traceback
+import typing as t
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from enflow.experiments.experiment import Experiment
+from enflow.problems.problem import Problem
+
+# Problems loaded by this process, so that a worker loads each problem once
+_problems = {}
+
+
+def get_problem(name):
+    """
+    Load a problem by name with :func:`load_problem`, once per process.
+
+    Loaders that return a (dataset, environment, objective) tuple are wrapped in a :class:`Problem`.
+    """
+    if name not in _problems:
+        from enflow.utils.loader import load_problem
+
+        problem = load_problem(name)
+        if isinstance(problem, tuple):
+            _, environment, objective = problem
+            problem = Problem(name=name, environment=environment, objective=objective)
+        _problems[name] = problem
+    return _problems[name]
+
+
+def run_experiment(problem, model, seed):
+    """
+    The default runner of a grid cell: seed NumPy's global generator and run one :class:`Experiment`.
+    """
+    np.random.seed(seed)
+    result = Experiment(problem, model).run()
+    score = result.score
+    return {
+        "score": float(np.mean(score)) if score is not None else np.nan,
+        "total_reward": float(np.nansum(result.rewards)),
+        "n_steps": result.n_steps,
+    }
+
+
+@dataclass(frozen=True)
+class GridCell:
+    """
+    One (problem, model, seed) cell of an :class:`ExperimentGrid`.
+    """
+    problem: str
+    model: str
+    seed: int
+
+
+def run_cell(cell, model_factory, runner, attempt):
+    """
+    Run one cell in the current process and return its result row. Exceptions are caught and reported in the row.
+    """
+    row = {"problem": cell.problem, "model": cell.model, "seed": cell.seed, "attempt": attempt,
+           "status": "ok", "error": None, "pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        problem = get_problem(cell.problem)
+        model = model_factory(problem, cell.seed)
+        row.update(runner(problem, model, cell.seed))
+    except Exception:
+        row["status"] = "failed"
+        row["error"] = traceback.format_exc(limit=5)
+    row["wall_time"] = time.perf_counter() - start
+    return row
+
+
+# The queue that a worker process reports the cells it starts and ends to, see ExperimentGrid.run
+_events = None
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+
+
+def run_tracked_cell(key, cell, model_factory, runner, attempt):
+    """
+    Run a cell with :func:`run_cell` in a worker process and report its start and end, identified by key, so that the
+    parent process can tell which cell was running when a worker process died.
+    """
+    _events.put((key, True))
+    try:
+        return run_cell(cell, model_factory, runner, attempt)
+    finally:
+        _events.put((key, False))
+
+
+class ResultsStore:
+    """
+    Columnar store of result rows: each column is a list that rows are appended to, and the store is converted to
+    a DataFrame or written to a Parquet or CSV file at the end.
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.n_rows = 0
+
+    def append(self, row):
+        """
+        Append a row given as a dict of column name to value. Missing columns are filled with None.
+        """
+        for name in row.keys() - self.columns.keys():
+            self.columns[name] = [None] * self.n_rows
+        for name, column in self.columns.items():
+            column.append(row.get(name))
+        self.n_rows += 1
+
+    def __len__(self):
+        return self.n_rows
+
+    def to_frame(self):
+        """
+        Convert the store to a DataFrame with one row per appended row.
+        """
+        return pd.DataFrame(self.columns)
+
+    def save(self, path):
+        """
+        Write the store to a Parquet file, which requires pyarrow, or to a CSV file, depending on the suffix of path.
+        """
+        frame = self.to_frame()
+        if str(path).endswith(".parquet"):
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+
+
+class ExperimentGrid:
+    """
+    Run every model on every problem for every seed, spreading the (problem, model, seed) cells over a process pool.
+
+    Cells are submitted grouped by problem, and each worker process loads a problem once with :func:`get_problem`
+    and reuses it for all its cells of that problem. Failed cells are retried up to max_retries times, also when a
+    worker process dies. A dead worker breaks the whole pool, but only the cell that the worker was running is
+    charged an attempt: the other cells of the pool are resubmitted with the same attempt, and when it cannot be
+    told which of several running cells killed its worker, these are rerun one at a time in a pool with a single
+    worker. The model factories and the runner must be picklable, i.e. defined at module level.
+    """
+
+    def __init__(self, problems, models, seeds, runner=run_experiment, max_retries=1, n_workers=None):
+        """
+        :param problems: list of problem names, e.g. from :func:`list_problems`.
+        :param models: dict of model name to a factory ``factory(problem, seed)`` that creates the model.
+        :param seeds: iterable of int seeds.
+        :param runner: callable ``runner(problem, model, seed)`` that runs one cell and returns a dict of results.
+        :param max_retries: int, the number of times a failed cell is retried.
+        :param n_workers: int, the number of worker processes. Defaults to the number of CPUs; 1 runs serially.
+        """
+        self.problems = list(problems)
+        self.models = dict(models)
+        self.seeds = list(seeds)
+        self.runner = runner
+        self.max_retries = max_retries
+        self.n_workers = n_workers if n_workers is not None else (os.cpu_count() or 1)
+
+    def cells(self) -> t.List[GridCell]:
+        """
+        Get all cells of the grid, grouped by problem.
+        """
+        return [GridCell(problem, model, seed) for problem, model, seed in itertools.product(self.problems, self.models, self.seeds)]
+
+    def run(self, store=None, executor=None):
+        """
+        Run all cells of the grid.
+        :param store: ResultsStore, optional store to append the result rows to.
+        :param executor: concurrent.futures.Executor, optional executor to use instead of a new process pool.
+        :return: ResultsStore with one row per cell, in order of completion.
+        """
+        store = store if store is not None else ResultsStore()
+        cells = self.cells()
+
+        if executor is None and self.n_workers <= 1:
+            for cell in cells:
+                for attempt in range(self.max_retries + 1):
+                    row = run_cell(cell, self.models[cell.model], self.runner, attempt)
+                    if row["status"] == "ok":
+                        break
+                store.append(row)
+            return store
+
+        owns_executor = executor is None
+        n_workers = min(self.n_workers, len(cells)) or 1
+        # The workers of the pools owned by the grid report the cells they start and end on this queue
+        events = multiprocessing.SimpleQueue() if owns_executor else None
+        started, ended = set(), set()
+
+        def new_pool(max_workers):
+            return ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(events,))
+
+        if owns_executor:
+            executor = new_pool(n_workers)
+        # Cells that may have killed a worker process are rerun one at a time in a pool with a single worker, where
+        # the oldest cell that did not end when the pool breaks is the one that killed it
+        quarantine = None
+        keys = itertools.count()
+        pending = {}
+
+        def submit(cell, attempt, pool):
+            key = next(keys)
+            if owns_executor:
+                future = pool.submit(run_tracked_cell, key, cell, self.models[cell.model], self.runner, attempt)
+            else:
+                future = pool.submit(run_cell, cell, self.models[cell.model], self.runner, attempt)
+            pending[future] = (key, cell, attempt, pool)
+
+        try:
+            for cell in cells:
+                submit(cell, 0, executor)
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if future not in pending:
+                        # Already resubmitted with the other cells of its broken pool
+                        continue
+                    key, cell, attempt, pool = pending.pop(future)
+                    try:
+                        row = future.result()
+                    except BrokenProcessPool:
+                        if not owns_executor:
+                            raise
+                        # All pending cells of a broken pool fail, but only the cell whose worker died is charged
+                        # an attempt, the others are resubmitted with the same attempt
+                        broken = [(key, cell, attempt)] + [pending.pop(other)[:3] for other in
+                                                           [other for other, entry in pending.items() if entry[3] is pool]]
+                        broken.sort(key=lambda entry: entry[0])
+                        while not events.empty():
+                            event_key, is_start = events.get()
+                            (started if is_start else ended).add(event_key)
+                        pool.shutdown(wait=False)
+
+                        suspects = []
+                        if pool is quarantine:
+                            quarantine = None
+                            culprit = next((entry for entry in broken if entry[0] not in ended), broken[0])
+                            suspects = [entry for entry in broken if entry is not culprit]
+                            innocent = []
+                        else:
+                            executor = new_pool(n_workers)
+                            running = [entry for entry in broken if entry[0] in started and entry[0] not in ended]
+                            if len(running) == 1:
+                                culprit = running[0]
+                            else:
+                                # Several cells were running, or the worker died before its cell started
+                                culprit = None
+                                suspects = running or broken
+                            innocent = [entry for entry in broken if entry is not culprit and entry not in suspects]
+
+                        if suspects and quarantine is None:
+                            quarantine = new_pool(1)
+                        for _, suspect, suspect_attempt in suspects:
+                            submit(suspect, suspect_attempt, quarantine)
+                        for _, other, other_attempt in innocent:
+                            submit(other, other_attempt, executor)
+                        if culprit is None:
+                            continue
+                        _, cell, attempt = culprit
+                        row = {"problem": cell.problem, "model": cell.model, "seed": cell.seed, "attempt": attempt,
+                               "status": "failed", "error": "The worker process died."}
+                    if row["status"] != "ok" and attempt < self.max_retries:
+                        submit(cell, attempt + 1, executor)
+                    else:
+                        store.append(row)
+        finally:
+            if owns_executor:
+                executor.shutdown()
+                if quarantine is not None:
+                    quarantine.shutdown()
+        return store
@@ -0,0 +1,194 @@
+import io
+import os
+import pickle
+import random
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Attributes larger than this are reported when an object without get_state is checkpointed
+LARGE_ATTRIBUTE_BYTES = 2 ** 20
+
+
+def _nbytes(value, depth=3, seen=None):
+    """
+    Estimate the memory taken by the arrays and pandas objects in a value, looking into containers and the
+    attributes of objects up to the given depth.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        return int(np.sum(value.memory_usage(index=True)))
+    if depth == 0:
+        return 0
+    seen = seen if seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, dict):
+        values = value.values()
+    elif isinstance(value, (list, tuple, set)):
+        values = value
+    elif hasattr(value, "__dict__") and not isinstance(value, type):
+        values = vars(value).values()
+    else:
+        return 0
+    return sum(_nbytes(item, depth - 1, seen) for item in values)
+
+
+def get_state(obj):
+    """
+    Get the state of an environment, model or objective to checkpoint.
+
+    Objects that define ``get_state`` return their own state, e.g. only the cursor of an environment that holds its
+    data. For other objects the state is their attributes, except the names listed in their ``transient`` class
+    attribute, such as scratch buffers. A warning is emitted for attributes larger than
+    :data:`LARGE_ATTRIBUTE_BYTES`, e.g. the data of an environment, since they are written with every checkpoint.
+    """
+    if obj is None:
+        return None
+    if hasattr(obj, "get_state"):
+        return obj.get_state()
+    transient = getattr(obj, "transient", ())
+    state = {name: value for name, value in vars(obj).items() if name not in transient}
+    for name, value in state.items():
+        nbytes = _nbytes(value)
+        if nbytes > LARGE_ATTRIBUTE_BYTES:
+            warnings.warn(f"Checkpointing the attribute {name!r} of {type(obj).__name__}, which takes "
+                          f"{nbytes / 2 ** 20:.1f} MB, with every checkpoint. Define get_state and set_state, or list "
+                          f"it in the transient class attribute, to checkpoint only what changes during a run.")
+    return state
+
+
+def set_state(obj, state):
+    """
+    Restore the state from :func:`get_state` into an object.
+    """
+    if obj is None or state is None:
+        return
+    if hasattr(obj, "set_state"):
+        obj.set_state(state)
+    else:
+        vars(obj).update(state)
+
+
+def _fsync_directory(directory):
+    """
+    Flush the entries of a directory to disk, where the platform supports it.
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Checkpoint:
+    """
+    Checkpoints of an experiment in a local directory, for resuming a long run after a crash.
+
+    A checkpoint has two files. The trajectory rows recorded since the previous checkpoint are appended to
+    rows.pkl as one pickled chunk, so that the cost of a checkpoint does not grow with the length of the run. The
+    rest of the state, i.e. the step counters, the last observation, the states of the environment, model and
+    objective, the running aggregates of the recorder and the random states, is written to a temporary file that
+    replaces state.pkl. The state records the size of rows.pkl when it was written, and bytes after that size, e.g.
+    from a save that was interrupted, are ignored on load and overwritten by the next save.
+    """
+    state_file = "state.pkl"
+    rows_file = "rows.pkl"
+
+    def __init__(self, directory, every=100):
+        """
+        :param directory: str, the directory of the checkpoint files. It is created if it does not exist.
+        :param every: int, the number of steps between checkpoints.
+        """
+        assert every >= 1, "Every must be at least 1."
+        self.directory = str(directory)
+        self.every = every
+        self.n_rows = 0
+        self.offset = 0
+
+    @property
+    def state_path(self):
+        return os.path.join(self.directory, self.state_file)
+
+    @property
+    def rows_path(self):
+        return os.path.join(self.directory, self.rows_file)
+
+    def exists(self):
+        """
+        Check if a checkpoint has been written.
+        """
+        return os.path.exists(self.state_path)
+
+    def save(self, state, recorder):
+        """
+        Write a checkpoint.
+        :param state: dict, the state of the experiment, which must be picklable.
+        :param recorder: :class:`TrajectoryRecorder`, whose rows after those of the previous checkpoint are appended.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        n_rows = len(recorder)
+        offset = self.offset
+        if n_rows > self.n_rows:
+            chunk = (self.n_rows, {name: recorder[name][self.n_rows:].copy() for name in recorder.buffers})
+            with open(self.rows_path, "r+b" if os.path.exists(self.rows_path) else "wb") as f:
+                f.seek(offset)
+                f.truncate()
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+                offset = f.tell()
+
+        state = {**state, "recorder": recorder.get_state(), "rows_offset": offset,
+                 "random": (np.random.get_state(), random.getstate())}
+        temporary = self.state_path + ".tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.state_path)
+        _fsync_directory(self.directory)
+        self.n_rows, self.offset = n_rows, offset
+
+    def load(self, recorder):
+        """
+        Read the last checkpoint and restore the trajectory rows and the random states.
+        :param recorder: :class:`TrajectoryRecorder` to restore the rows into.
+        :return: dict, the state passed to :meth:`save`, or None if there is no checkpoint.
+        """
+        if not self.exists():
+            return None
+        with open(self.state_path, "rb") as f:
+            state = pickle.load(f)
+
+        offset = state.pop("rows_offset")
+        chunks = []
+        if offset:
+            with open(self.rows_path, "rb") as f:
+                data = io.BytesIO(f.read(offset))
+            while data.tell() < offset:
+                chunks.append(pickle.load(data))
+        recorder.set_state(state.pop("recorder"), chunks)
+
+        numpy_state, python_state = state.pop("random")
+        np.random.set_state(numpy_state)
+        random.setstate(python_state)
+        self.n_rows, self.offset = len(recorder), offset
+        return state
+
+    def clear(self):
+        """
+        Delete the checkpoint files, leaving the directory and any other files in it.
+        """
+        for path in (self.state_path, self.state_path + ".tmp", self.rows_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.n_rows, self.offset = 0, 0
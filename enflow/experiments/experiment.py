@@ -1,26 +1,326 @@
-from abc import ABC, abstractmethod
+import copy
+import typing as t
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from enflow.experiments.checkpoint import Checkpoint, get_state, set_state
+from enflow.experiments.instrumentation import null_phase
+from enflow.experiments.recorder import TrajectoryRecorder
+from enflow.problems.objective import StreamingObjective
+
+
+@dataclass
+class Transition:
+    """
+    The outcome of one environment step, normalized over the step signatures of the environments.
+
+    Gymnasium environments return (observation, reward, terminated, truncated, info). Forecasting environments
+    such as :class:`GEFCom2014SolarEnv` return (next_input, target, done), where target holds the true values of
+    the period that the action predicted.
+    """
+    observation: t.Any
+    reward: t.Any = None
+    target: t.Any = None
+    done: bool = False
+    info: dict = field(default_factory=dict)
+
+
+@dataclass
+class ExperimentResult:
+    """
+    The result of an experiment run.
+
+    :param rewards: numpy array of the rewards per step, with one column per environment for a batch run.
+    :param score: the result of the streaming objective over all steps, or None if the environment returns no
+                  targets or the objective does not support streaming evaluation.
+    :param n_steps: int, the number of steps that were run.
+    """
+    rewards: np.ndarray
+    score: t.Any = None
+    n_steps: int = 0
+
+
+def reset_env(env, seed=None):
+    """
+    Reset an environment and get its first observation. A gymnasium (observation, info) tuple is unpacked.
+    """
+    result = env.reset() if seed is None else env.reset(seed=seed)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], dict):
+        return result[0]
+    return result
+
+
+def step_env(env, action):
+    """
+    Step an environment and normalize its outcome to a :class:`Transition`.
+    """
+    result = env.step(action)
+    if len(result) == 5:
+        observation, reward, terminated, truncated, info = result
+        return Transition(observation, reward=reward, done=bool(terminated or truncated), info=info)
+    if len(result) == 4:
+        observation, reward, done, info = result
+        return Transition(observation, reward=reward, done=bool(done), info=info)
+    if len(result) == 3:
+        observation, target, done = result
+        return Transition(observation, target=target, done=bool(done))
+    raise ValueError(f"Unsupported step result of length {len(result)} from {env}.")
+
+
+def get_action(model, observation):
+    """
+    Get the action of an agent, or the prediction of a predictor, for an observation.
+    """
+    if hasattr(model, "act"):
+        return model.act(observation)
+    return model.predict(observation)
+
+
+def action_phase(model):
+    """
+    Get the name of the phase that :func:`get_action` times for a model.
+    """
+    return "model.act" if hasattr(model, "act") else "model.predict"
+
+
+def supports_streaming(objective):
+    """
+    Check if an objective implements the streaming interface, see :class:`StreamingObjective`.
+    """
+    return isinstance(objective, StreamingObjective)
+
+
+def stack_observations(observations):
+    """
+    Stack the observations of several environments along a new first axis.
+
+    Dicts are stacked per key, DataFrames and arrays into one array.
+    """
+    first = observations[0]
+    if isinstance(first, dict):
+        return {key: stack_observations([observation[key] for observation in observations]) for key in first}
+    if isinstance(first, (pd.DataFrame, pd.Series)):
+        return np.stack([observation.to_numpy() for observation in observations])
+    return np.stack([np.asarray(observation) for observation in observations])
+
+
+def unstack_actions(actions, i):
+    """
+    Get the action of environment i from a batch of actions stacked along the first axis.
+    """
+    if isinstance(actions, dict):
+        return {key: unstack_actions(value, i) for key, value in actions.items()}
+    if isinstance(actions, (pd.DataFrame, pd.Series)):
+        return actions.iloc[i]
+    return actions[i]
+
+
+def concatenate(values):
+    """
+    Concatenate the targets or actions of several environments along the rows.
+    """
+    if isinstance(values[0], (pd.DataFrame, pd.Series)):
+        return pd.concat(values)
+    return np.concatenate([np.atleast_1d(np.asarray(value)) for value in values])
 
 
 class Experiment:
-    def __init__(self, problem, model):
+    def __init__(self, problem, model, instrumentation=None, recorder=None):
         """
         Initialize the experiment.
+        :param problem: The :class:`Problem` with the environment and objective.
+        :param model: The model, an :class:`Agent` or :class:`Predictor`.
+        :param instrumentation: :class:`Instrumentation`, optional, to time the env.reset, env.step, model.act or
+                                model.predict, objective.update, objective.result and checkpoint phases of each run.
+        :param recorder: :class:`TrajectoryRecorder`, optional, that the rewards are recorded in, as the column
+                         "reward". It is reset at the start of each run.
         """
         self.problem = problem
         self.model = model
+        self.instrumentation = instrumentation
+        self.recorder = recorder if recorder is not None else TrajectoryRecorder()
 
-    def run(self):
+    def run(self, max_steps=None, checkpoint=None, resume=True):
         """
-        Run the experiment.
+        Run the experiment for one episode.
+
+        The model acts on each observation, with :meth:`Agent.act` or :meth:`Predictor.predict`. Rewards returned
+        by the environment are recorded, and targets are passed with the action to the streaming objective of the
+        problem, see :meth:`StreamingObjective.update`.
+
+        With a checkpoint, the state of the run is saved every ``checkpoint.every`` steps and at the end of the run,
+        see :class:`Checkpoint`. The states of the environment, model and objective are taken with
+        :func:`get_state`, so environments that hold their data, such as :class:`GEFCom2014SolarEnv`, should define
+        ``get_state`` and ``set_state`` methods that save only their cursor. If the checkpoint exists and resume is
+        True, the run continues from the step after the last checkpoint instead of resetting the environment.
+        :param max_steps: int, optional maximum number of steps, including the steps before a resumed checkpoint.
+        :param checkpoint: :class:`Checkpoint` or str, optional, a checkpoint or the directory of one.
+        :param resume: bool, whether to resume from an existing checkpoint. Otherwise it is overwritten.
+        :return: ExperimentResult
         """
         env = self.problem.environment
-        state = env.reset()
         objective = self.problem.objective
-        done = False
+        streaming = supports_streaming(objective)
+        phase = self.instrumentation.phase if self.instrumentation is not None else null_phase
+        model_phase = action_phase(self.model)
+        recorder = self.recorder
+        if checkpoint is not None and not isinstance(checkpoint, Checkpoint):
+            checkpoint = Checkpoint(checkpoint)
+
+        state = None
+        if checkpoint is not None:
+            if resume:
+                state = checkpoint.load(recorder)
+            else:
+                checkpoint.clear()
+        if state is not None:
+            set_state(env, state["environment"])
+            set_state(self.model, state["model"])
+            set_state(objective, state["objective"])
+            observation, done = state["observation"], state["done"]
+            n_steps, n_targets = state["n_steps"], state["n_targets"]
+        else:
+            if streaming:
+                objective.reset()
+            recorder.reset()
+            with phase("env.reset"):
+                observation = reset_env(env)
+            n_steps, n_targets = 0, 0
+            done = False
+
+        while not done and (max_steps is None or n_steps < max_steps):
+            with phase(model_phase):
+                action = get_action(self.model, observation)
+            with phase("env.step"):
+                transition = step_env(env, action)
+            if transition.reward is not None:
+                recorder.record(reward=transition.reward)
+            if transition.target is not None and streaming:
+                with phase("objective.update"):
+                    objective.update(transition.target, action)
+                n_targets += 1
+            observation, done = transition.observation, transition.done
+            n_steps += 1
 
+            if checkpoint is not None and (done or n_steps % checkpoint.every == 0):
+                with phase("checkpoint"):
+                    checkpoint.save(self._state(observation, done, n_steps, n_targets), recorder)
+        if checkpoint is not None and not done and n_steps % checkpoint.every:
+            with phase("checkpoint"):
+                checkpoint.save(self._state(observation, done, n_steps, n_targets), recorder)
+
+        score = None
+        if n_targets:
+            with phase("objective.result"):
+                score = objective.result()
+        rewards = recorder["reward"].astype(float) if "reward" in recorder.buffers else np.empty(0)
+        return ExperimentResult(rewards, score, n_steps)
+
+    def _state(self, observation, done, n_steps, n_targets):
+        """
+        Get the state of a run to checkpoint.
+        """
+        return {
+            "n_steps": n_steps,
+            "n_targets": n_targets,
+            "done": done,
+            "observation": observation,
+            "environment": get_state(self.problem.environment),
+            "model": get_state(self.model),
+            "objective": get_state(self.problem.objective),
+        }
+
+
+class BatchExperiment:
+    """
+    Run N instances of an environment in lock-step with one model, e.g. one instance per seed or building.
+
+    At each step the observations of the running environments are stacked along a new first axis, see
+    :func:`stack_observations`, and a batched model, one with ``batched = True``, is called once with the whole
+    batch. Other models are called once per environment. The targets and actions of all environments are
+    concatenated and passed to the streaming objective in one update per step.
+    """
+
+    def __init__(self, problem, model, n_envs=None, envs=None, instrumentation=None):
+        """
+        :param problem: The :class:`Problem` with the environment and objective.
+        :param model: The model, an :class:`Agent` or :class:`Predictor`.
+        :param n_envs: int, the number of copies of the environment of the problem to run.
+        :param envs: list of environments to run instead of copies of the environment of the problem.
+        :param instrumentation: :class:`Instrumentation`, optional, to time the phases of each run as in
+                                :class:`Experiment`. A batched model call is timed as one call.
+        """
+        assert (n_envs is None) != (envs is None), "Either n_envs or envs must be given."
+        self.problem = problem
+        self.model = model
+        self.instrumentation = instrumentation
+        self.envs = list(envs) if envs is not None else [copy.deepcopy(problem.environment) for _ in range(n_envs)]
+
+    @property
+    def n_envs(self):
+        return len(self.envs)
+
+    def run(self, max_steps=None, seeds=None):
+        """
+        Run all environments until each is done.
+        :param max_steps: int, optional maximum number of steps.
+        :param seeds: list of int, optional seeds to reset the environments with.
+        :return: ExperimentResult with rewards of shape (n_steps, n_envs), NaN after an environment is done.
+        """
+        objective = self.problem.objective if self.problem is not None else None
+        streaming = supports_streaming(objective)
+        if streaming:
+            objective.reset()
+        batched = getattr(self.model, "batched", False)
+        phase = self.instrumentation.phase if self.instrumentation is not None else null_phase
+        model_phase = action_phase(self.model)
+
+        seeds = seeds if seeds is not None else [None] * self.n_envs
+        observations = []
+        for env, seed in zip(self.envs, seeds):
+            with phase("env.reset"):
+                observations.append(reset_env(env, seed))
+        active = np.arange(self.n_envs)
         rewards = []
-        while not done:
-            action = self.model.get_action(state)
-            state, done, info = env.step(action)
-            reward = objective.evaluate(state, action, info)
-            rewards.append(reward)
\ No newline at end of file
+        n_steps, n_targets = 0, 0
+
+        while len(active) and (max_steps is None or n_steps < max_steps):
+            if batched:
+                batch = stack_observations([observations[i] for i in active])
+                with phase(model_phase):
+                    actions = get_action(self.model, batch)
+                actions = [unstack_actions(actions, k) for k in range(len(active))]
+            else:
+                actions = []
+                for i in active:
+                    with phase(model_phase):
+                        actions.append(get_action(self.model, observations[i]))
+
+            step_rewards = np.full(self.n_envs, np.nan)
+            targets, done = [], np.zeros(len(active), dtype=bool)
+            for k, (i, action) in enumerate(zip(active, actions)):
+                with phase("env.step"):
+                    transition = step_env(self.envs[i], action)
+                observations[i] = transition.observation
+                done[k] = transition.done
+                if transition.reward is not None:
+                    step_rewards[i] = transition.reward
+                if transition.target is not None:
+                    targets.append((transition.target, action))
+
+            if targets and streaming:
+                with phase("objective.update"):
+                    objective.update(concatenate([target for target, _ in targets]), concatenate([action for _, action in targets]))
+                n_targets += 1
+            rewards.append(step_rewards)
+            active = active[~done]
+            n_steps += 1
+
+        score = None
+        if n_targets:
+            with phase("objective.result"):
+                score = objective.result()
+        rewards = np.array(rewards) if rewards else np.empty((0, self.n_envs))
+        return ExperimentResult(rewards, score, n_steps)
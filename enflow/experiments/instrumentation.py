@@ -0,0 +1,205 @@
+import contextlib
+import inspect
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+# Upper bounds in seconds of the latency histogram buckets, from 10 microseconds to 10 seconds
+DEFAULT_BUCKETS = tuple(float(f"{mantissa}e{exponent}") for exponent in range(-5, 1) for mantissa in (1, 2.5, 5)) + (10.0,)
+
+_NULL_PHASE = contextlib.nullcontext()
+
+
+def null_phase(name):
+    """
+    The phase of disabled instrumentation: a shared no-op context manager.
+    """
+    return _NULL_PHASE
+
+
+class _Phase:
+    """
+    Context manager that times one call of a phase.
+    """
+    __slots__ = ("samples", "wall", "cpu")
+
+    def __init__(self, samples):
+        self.samples = samples
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        cpu = time.process_time() - self.cpu
+        wall = time.perf_counter() - self.wall
+        self.samples[0].append(wall)
+        self.samples[1].append(cpu)
+        return False
+
+
+class Instrumentation:
+    """
+    Collect the wall and CPU time of each call of the phases of an experiment, e.g. env.reset, env.step,
+    model.act, model.predict and objective.update.
+
+    Timing a call costs two clock reads on entry and exit and an append per clock. When disabled, :meth:`phase`
+    returns a shared no-op context manager. Reports are computed from the samples on demand: call counts,
+    totals, p50/p95/p99 latency and histograms with the given bucket bounds.
+    """
+
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        """
+        :param enabled: bool, whether to time the phases.
+        :param buckets: tuple of float, the upper bounds in seconds of the histogram buckets.
+        """
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self.samples = {}
+
+    def phase(self, name):
+        """
+        Get a context manager that times one call of a phase.
+        :param name: str, the name of the phase, e.g. "env.step".
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = ([], [])
+        return _Phase(samples)
+
+    def reset(self):
+        """
+        Discard all samples.
+        """
+        self.samples = {}
+
+    def histogram(self, name, clock="wall"):
+        """
+        Get the number of calls of a phase per histogram bucket.
+        :param name: str, the name of the phase.
+        :param clock: "wall" or "cpu".
+        :return: numpy array with the count of each bucket of buckets, followed by the count above the last bucket.
+        """
+        values = np.asarray(self.samples[name][0 if clock == "wall" else 1])
+        return np.bincount(np.searchsorted(self.buckets, values, side="left"), minlength=len(self.buckets) + 1)
+
+    def report(self):
+        """
+        Summarize the samples of each phase.
+        :return: pandas DataFrame with a row per phase and the number of calls, the total, mean, p50, p95, p99 and
+                 max wall time, and the total and mean CPU time, in seconds.
+        """
+        rows = {}
+        for name, (wall, cpu) in self.samples.items():
+            wall, cpu = np.asarray(wall), np.asarray(cpu)
+            if not len(wall):
+                continue
+            p50, p95, p99 = np.percentile(wall, [50, 95, 99])
+            rows[name] = {
+                "calls": len(wall),
+                "wall_total": wall.sum(),
+                "wall_mean": wall.mean(),
+                "wall_p50": p50,
+                "wall_p95": p95,
+                "wall_p99": p99,
+                "wall_max": wall.max(),
+                "cpu_total": cpu.sum(),
+                "cpu_mean": cpu.mean(),
+            }
+        columns = ["calls", "wall_total", "wall_mean", "wall_p50", "wall_p95", "wall_p99", "wall_max", "cpu_total", "cpu_mean"]
+        return pd.DataFrame.from_dict(rows, orient="index", columns=columns).rename_axis("phase")
+
+    def to_json(self, path=None):
+        """
+        Write the report and the wall and CPU histograms of each phase as JSON.
+        :param path: str, optional path of the file to write.
+        :return: str, the JSON text.
+        """
+        report = self.report()
+        data = {"buckets": list(self.buckets), "phases": {}}
+        for name, row in report.iterrows():
+            data["phases"][name] = {
+                **{key: (int(value) if key == "calls" else float(value)) for key, value in row.items()},
+                "wall_histogram": self.histogram(name, "wall").tolist(),
+                "cpu_histogram": self.histogram(name, "cpu").tolist(),
+            }
+        text = json.dumps(data, indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def to_openmetrics(self, path=None, prefix="enflow_phase"):
+        """
+        Write the wall and CPU time histograms of each phase in the OpenMetrics text format.
+        :param path: str, optional path of the file to write.
+        :param prefix: str, the prefix of the metric names.
+        :return: str, the OpenMetrics text.
+        """
+        lines = []
+        for clock in ("wall", "cpu"):
+            metric = f"{prefix}_{clock}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            lines.append(f"# UNIT {metric} seconds")
+            lines.append(f"# HELP {metric} {clock.upper() if clock == 'cpu' else 'Wall'} time per call of each experiment phase.")
+            for name, samples in self.samples.items():
+                values = samples[0 if clock == "wall" else 1]
+                if not values:
+                    continue
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                counts = np.cumsum(self.histogram(name, clock))
+                for bound, count in zip(self.buckets, counts):
+                    lines.append(f'{metric}_bucket{{phase="{label}",le="{bound:g}"}} {count}')
+                lines.append(f'{metric}_bucket{{phase="{label}",le="+Inf"}} {counts[-1]}')
+                lines.append(f'{metric}_count{{phase="{label}"}} {len(values)}')
+                lines.append(f'{metric}_sum{{phase="{label}"}} {float(np.sum(values))!r}')
+        lines.append("# EOF")
+        text = "\n".join(lines) + "\n"
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+
+class InstrumentedModel:
+    """
+    Wrap a model so that calls of its act, predict, learn, train and optimize methods are timed as the phases
+    "<prefix>.<method>". Other attributes are looked up on the wrapped model. Methods that are coroutine functions
+    are wrapped in coroutine functions that time the call until the awaited result, e.g. a reply from a server.
+    """
+    methods = ("act", "predict", "learn", "train", "optimize")
+
+    def __init__(self, model, instrumentation, prefix="model"):
+        """
+        :param model: The model to wrap, e.g. an :class:`Agent` or :class:`Predictor`.
+        :param instrumentation: The :class:`Instrumentation` to record the timings in.
+        :param prefix: str, the prefix of the phase names.
+        """
+        self.model = model
+        self.instrumentation = instrumentation
+        self.prefix = prefix
+
+    def __getattr__(self, name):
+        if name == "model":
+            raise AttributeError(name)
+        attribute = getattr(self.model, name)
+        if name not in self.methods or not callable(attribute):
+            return attribute
+        phase = f"{self.prefix}.{name}"
+        instrumentation = self.instrumentation
+
+        if inspect.iscoroutinefunction(attribute):
+            async def timed_async(*args, **kwargs):
+                with instrumentation.phase(phase):
+                    return await attribute(*args, **kwargs)
+            return timed_async
+
+        def timed(*args, **kwargs):
+            with instrumentation.phase(phase):
+                return attribute(*args, **kwargs)
+        return timed
@@ -0,0 +1,304 @@
+import copy
+import datetime
+
+import numpy as np
+import pandas as pd
+
+
+def _as_value(value):
+    """
+    Convert a recorded value to a NumPy value, mapping timestamps to datetime64 in nanoseconds. Timezone-aware
+    timestamps are converted to UTC, since datetime64 has no timezone.
+    :return: tuple of the value and its timezone, which is None for values without a timezone.
+    """
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        value = pd.Timestamp(value)
+        return np.datetime64(value.tz_convert("UTC").tz_localize(None).to_datetime64(), "ns"), value.tz
+    if isinstance(value, pd.Timestamp):
+        return np.datetime64(value.to_datetime64(), "ns"), None
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return np.datetime64(value, "ns"), None
+    return value, None
+
+
+def _as_array(value):
+    """
+    Convert recorded values to a NumPy array, like :func:`_as_value`.
+    :return: tuple of the array and its timezone, which is None for values without a timezone.
+    """
+    if isinstance(value, pd.Series):
+        value = pd.Index(value)
+    if isinstance(value, (list, tuple, np.ndarray)) and len(value) and isinstance(value[0], datetime.datetime):
+        value = pd.Index(value)
+    if isinstance(value, pd.DatetimeIndex):
+        tz = value.tz
+        if tz is not None:
+            value = value.tz_convert("UTC").tz_localize(None)
+        return value.to_numpy().astype("datetime64[ns]", copy=False), tz
+    if isinstance(value, pd.Index):
+        return value.to_numpy(), None
+    value, tz = _as_value(value)
+    return np.asarray(value), tz
+
+
+def _fill_value(dtype):
+    """
+    Get the value that rows of a column are filled with before they are recorded.
+    """
+    if np.issubdtype(dtype, np.floating) or np.issubdtype(dtype, np.complexfloating):
+        return np.nan
+    if np.issubdtype(dtype, np.datetime64) or np.issubdtype(dtype, np.timedelta64):
+        return np.datetime64("NaT") if np.issubdtype(dtype, np.datetime64) else np.timedelta64("NaT")
+    if dtype == object:
+        return None
+    return 0
+
+
+class TrajectoryRecorder:
+    """
+    Record the values of an episode step by step into preallocated NumPy column buffers keyed by name.
+
+    Recording a step writes one row into each buffer, and buffers double in size when they are full, so recording
+    is amortized O(1) per step. The trajectory is turned into a DataFrame once, with :meth:`to_frame`, at the end
+    of the episode. The dtype of a column is that of its first value, e.g. float for numbers and datetime64 for
+    timestamps, with strings kept as objects, and a value can also be an array, e.g. one value per building. Rows of a column that were not
+    recorded are NaN, NaT, None or 0 depending on the dtype. Timezone-aware timestamps are stored as UTC datetime64
+    with the timezone of the column, which :meth:`to_frame` converts them back to.
+
+    Aggregates of numeric columns, e.g. the total costs, can be computed on the fly with the aggregates argument,
+    so that they are available during the episode without converting the trajectory.
+    """
+    aggregations = ("sum", "mean", "min", "max", "count", "positive_sum", "negative_sum")
+
+    def __init__(self, columns=None, capacity=1024, aggregates=None):
+        """
+        :param columns: list of column names, optional, to fix the order of the columns of :meth:`to_frame`.
+        :param capacity: int, the initial number of rows of the buffers.
+        :param aggregates: dict of column name to an aggregation or a list of aggregations, out of "sum", "mean",
+                           "min", "max", "count", "positive_sum" and "negative_sum".
+        """
+        assert capacity >= 1, "Capacity must be at least 1."
+        self.capacity = capacity
+        self.n_rows = 0
+        self.buffers = {}
+        self.columns = list(columns) if columns is not None else []
+        # The timezone of each column of timezone-aware timestamps, whose buffers hold UTC datetime64
+        self.timezones = {}
+
+        self.aggregates = {}
+        for name, aggregations in (aggregates or {}).items():
+            aggregations = [aggregations] if isinstance(aggregations, str) else list(aggregations)
+            for aggregation in aggregations:
+                assert aggregation in self.aggregations, f"Unknown aggregation: {aggregation}."
+            self.aggregates[name] = aggregations
+        self._state = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def _buffer(self, name, value):
+        """
+        Get the buffer of a column, creating it from the dtype and shape of its first value.
+        """
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            value = np.asarray(value)
+            dtype = value.dtype
+            if dtype.kind in "biu":
+                dtype = np.dtype(float)
+            elif dtype.kind in "US":
+                # A fixed width string column would silently truncate longer strings recorded later
+                dtype = np.dtype(object)
+            buffer = np.full((self.capacity,) + value.shape, _fill_value(dtype), dtype=dtype)
+            self.buffers[name] = buffer
+            if name not in self.columns:
+                self.columns.append(name)
+        return buffer
+
+    def _check_timezone(self, name, tz):
+        """
+        Check that timestamps with or without a timezone are recorded into a column of the same kind, and set the
+        timezone of a new column.
+        """
+        if name in self.buffers:
+            if (tz is None) != (self.timezones.get(name) is None):
+                raise ValueError(f"Cannot record timestamps {'with' if tz is not None else 'without'} a timezone "
+                                 f"into the column {name!r} of timestamps {'without' if tz is not None else 'with'} one.")
+        elif tz is not None:
+            self.timezones[name] = tz
+
+    def _reserve(self, n_rows):
+        """
+        Make sure that the buffers have room for n_rows more rows, doubling their capacity as needed.
+        """
+        required = self.n_rows + n_rows
+        if required <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < required:
+            capacity *= 2
+        for name, buffer in self.buffers.items():
+            grown = np.full((capacity,) + buffer.shape[1:], _fill_value(buffer.dtype), dtype=buffer.dtype)
+            grown[:self.n_rows] = buffer[:self.n_rows]
+            self.buffers[name] = grown
+        self.capacity = capacity
+
+    def record(self, values=None, **kwargs):
+        """
+        Record one step.
+        :param values: dict of column name to value, for names that are not valid keyword arguments.
+        :param kwargs: column name to value.
+        """
+        values = {**values, **kwargs} if values is not None else kwargs
+        self._reserve(1)
+        for name, value in values.items():
+            value, tz = _as_value(value)
+            if tz is not None or name in self.timezones:
+                self._check_timezone(name, tz)
+            self._buffer(name, value)[self.n_rows] = value
+            if name in self.aggregates:
+                if np.ndim(value):
+                    self._aggregate(name, np.asarray(value, dtype=float)[np.newaxis])
+                else:
+                    self._aggregate_scalar(name, float(value))
+        self.n_rows += 1
+
+    def extend(self, values=None, **kwargs):
+        """
+        Record several steps at once, e.g. the steps of a time horizon.
+        :param values: dict of column name to an array-like with one value per step. Scalars are broadcast.
+        :param kwargs: column name to an array-like with one value per step.
+        """
+        values = {**values, **kwargs} if values is not None else kwargs
+        arrays = {}
+        for name, value in values.items():
+            arrays[name], tz = _as_array(value)
+            if tz is not None or name in self.timezones:
+                self._check_timezone(name, tz)
+        n_rows = max((len(array) for array in arrays.values() if array.ndim), default=1)
+        self._reserve(n_rows)
+        for name, array in arrays.items():
+            array = np.broadcast_to(array, (n_rows,) + array.shape[1:]) if array.ndim else np.full(n_rows, array)
+            self._buffer(name, array[0])[self.n_rows:self.n_rows + n_rows] = array
+            if name in self.aggregates:
+                self._aggregate(name, array.astype(float))
+        self.n_rows += n_rows
+
+    def _aggregate(self, name, values):
+        """
+        Update the running aggregates of a column with the values of new rows.
+        """
+        state = self._state.setdefault(name, {})
+        valid = ~np.isnan(values)
+        updates = {
+            "sum": lambda: np.nansum(values, axis=0),
+            "count": lambda: valid.sum(axis=0),
+            "positive_sum": lambda: np.where(valid & (values > 0), values, 0).sum(axis=0),
+            "negative_sum": lambda: np.where(valid & (values < 0), values, 0).sum(axis=0),
+        }
+        for key in ("sum", "count", "positive_sum", "negative_sum"):
+            state[key] = state.get(key, 0) + updates[key]()
+        if valid.any():
+            state["min"] = np.fmin(state["min"], np.nanmin(values, axis=0)) if "min" in state else np.nanmin(values, axis=0)
+            state["max"] = np.fmax(state["max"], np.nanmax(values, axis=0)) if "max" in state else np.nanmax(values, axis=0)
+
+    def _aggregate_scalar(self, name, value):
+        """
+        Update the running aggregates of a column with one scalar value, without NumPy overhead.
+        """
+        state = self._state.get(name)
+        if state is None:
+            state = self._state[name] = {"sum": 0.0, "count": 0, "positive_sum": 0.0, "negative_sum": 0.0}
+        if value != value:
+            return
+        state["sum"] += value
+        state["count"] += 1
+        if value > 0:
+            state["positive_sum"] += value
+        elif value < 0:
+            state["negative_sum"] += value
+        state["min"] = min(state["min"], value) if "min" in state else value
+        state["max"] = max(state["max"], value) if "max" in state else value
+
+    def aggregate(self, name=None):
+        """
+        Get the aggregates computed on the fly.
+        :param name: str, optional column name. Defaults to all aggregated columns.
+        :return: dict of aggregation to value for one column, or dict of column name to such dicts.
+        """
+        if name is None:
+            return {name: self.aggregate(name) for name in self.aggregates}
+        state = self._state.get(name, {})
+        result = {}
+        for aggregation in self.aggregates[name]:
+            if aggregation == "mean":
+                count = state.get("count", 0)
+                result[aggregation] = state.get("sum", 0) / count if np.all(count) else np.nan
+            else:
+                result[aggregation] = state.get(aggregation, 0 if aggregation in ("sum", "count", "positive_sum", "negative_sum") else np.nan)
+        return result
+
+    def __getitem__(self, name) -> np.ndarray:
+        """
+        Get a view of the recorded values of a column. Timezone-aware timestamps are in UTC, see :attr:`timezones`.
+        """
+        return self.buffers[name][:self.n_rows]
+
+    def to_frame(self, index=None) -> pd.DataFrame:
+        """
+        Convert the trajectory to a DataFrame with one row per recorded step and one column per name. Columns of
+        array values are split into one column per element, named name_1 to name_n. Columns of timezone-aware
+        timestamps are converted back to their timezone.
+        :param index: optional index of the DataFrame, e.g. the time steps.
+        """
+        data = {}
+        for name in self.columns:
+            buffer = self.buffers.get(name)
+            tz = self.timezones.get(name)
+            if buffer is None:
+                data[name] = np.full(self.n_rows, np.nan)
+            elif buffer.ndim == 1:
+                data[name] = buffer[:self.n_rows].copy()
+            else:
+                flat = buffer[:self.n_rows].reshape(self.n_rows, -1)
+                for i in range(flat.shape[1]):
+                    data[f"{name}_{i + 1}"] = flat[:, i].copy()
+            if tz is not None:
+                for key in ([name] if buffer.ndim == 1 else [f"{name}_{i + 1}" for i in range(flat.shape[1])]):
+                    data[key] = pd.DatetimeIndex(data[key]).tz_localize("UTC").tz_convert(tz).array
+        return pd.DataFrame(data, index=index)
+
+    def get_state(self):
+        """
+        Get the state of the recorder without its rows, i.e. the order of the columns, the number of rows and the
+        running aggregates, e.g. to checkpoint it together with the rows, see :class:`Checkpoint`.
+        """
+        return {"columns": list(self.columns), "n_rows": self.n_rows, "aggregates": copy.deepcopy(self._state),
+                "timezones": dict(self.timezones)}
+
+    def set_state(self, state, chunks):
+        """
+        Restore the recorder from its state and its rows.
+        :param state: dict, from :meth:`get_state`.
+        :param chunks: list of (start, rows) tuples, where rows is a dict of column name to an array of the values
+                       of the rows from start on.
+        """
+        self.reset()
+        self._reserve(state["n_rows"])
+        for start, rows in chunks:
+            for name, values in rows.items():
+                if len(values):
+                    self._buffer(name, values[0])[start:start + len(values)] = values
+        self.columns = list(state["columns"])
+        self.n_rows = state["n_rows"]
+        self.timezones = dict(state.get("timezones", {}))
+        self._state = copy.deepcopy(state["aggregates"])
+
+    def reset(self):
+        """
+        Clear the recorded steps and aggregates, keeping the allocated buffers.
+        """
+        for buffer in self.buffers.values():
+            buffer[:self.n_rows] = _fill_value(buffer.dtype)
+        self.n_rows = 0
+        self._state = {}
@@ -3,3 +3,4 @@ from .simulator import Simulator
 from .predictor import Predictor
 from .optimizer import Optimizer
 from .agent import Agent
+from .postprocessing import QuantileRepair, PostprocessedPredictor
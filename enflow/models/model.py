@@ -9,6 +9,11 @@ class Model:
     ----------
     name : str
         Name of the model.
+    batched : bool
+        Whether the model acts on, or predicts for, a batch of observations stacked along the first axis, as
+        passed by :class:`enflow.experiments.BatchExperiment`.
     """
+    batched = False
+
     def __init__(self, name):
         self.name = name
\ No newline at end of file
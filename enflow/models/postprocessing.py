@@ -0,0 +1,165 @@
+import gymnasium as gym
+import numpy as np
+
+from enflow.models.predictor import Predictor
+
+
+def isotonic_regression(values):
+    """
+    Project each row of a 2-D array onto non-decreasing sequences, minimizing the squared distance, in place.
+
+    Runs the pool adjacent violators algorithm on all rows at once: the columns are pushed one by one onto a
+    stack of blocks per row, and the top two blocks are merged for every row where they violate the order.
+    Rows that are already non-decreasing or have NaN values are left unchanged.
+
+    :param values: A 2-D float array of shape (rows, n), e.g. the quantile forecasts of each row.
+    :return: The values.
+    """
+    n_rows, n_columns = values.shape
+    rows = np.flatnonzero((np.diff(values, axis=1) < 0).any(axis=1) & ~np.isnan(values).any(axis=1))
+    data = np.ascontiguousarray(values[rows].T)
+    n = len(rows)
+
+    # Stacks of block means and weights, stored level by level so that level d of row r is at d * n + r
+    means = np.empty(n_columns * n)
+    weights = np.zeros(n_columns * n, dtype=np.intp)
+    row_index = np.arange(n)
+    depth = np.zeros(n, dtype=np.intp)
+
+    for j in range(n_columns):
+        tops = depth * n + row_index
+        means[tops] = data[j]
+        weights[tops] = 1
+        depth += 1
+
+        # Only rows whose new value is below the block under it can violate the order
+        active = np.flatnonzero((depth >= 2) & (means[tops - n] > data[j]))
+        while len(active):
+            top = (depth[active] - 1) * n + active
+            below = top - n
+            weight = weights[below] + weights[top]
+            means[below] = (means[below] * weights[below] + means[top] * weights[top]) / weight
+            weights[below] = weight
+            weights[top] = 0
+            depth[active] -= 1
+
+            active = active[depth[active] >= 2]
+            top = (depth[active] - 1) * n + active
+            active = active[means[top - n] > means[top]]
+
+    # Repeating each block mean by its weight, block by block within each row, restores the rows
+    means, weights = means.reshape(n_columns, n).T, weights.reshape(n_columns, n).T
+    used = weights > 0
+    values[rows] = np.repeat(means[used], weights[used]).reshape(n, n_columns)
+    return values
+
+
+class QuantileRepair:
+    """
+    Post-processing stage that repairs crossing quantile forecasts in a :class:`DataFrameSpace` prediction.
+
+    The quantiles of each final space, e.g. the Quantile_forecast Box of each site, are made non-decreasing by
+    sorting them or by isotonic projection, and clipped to the bounds of the space. Final spaces of the same size
+    that are adjacent in the layout are repaired together as one (rows, spaces, quantiles) array, which is a view
+    of the prediction when it holds a single dtype block, as the frames of :meth:`DataFrameSpace.sample`,
+    :meth:`DataFrameSpace.zeros` and :meth:`DataFrameSpace.from_array` do. Otherwise the columns are repaired in a
+    copy and written back.
+    """
+    methods = ("sort", "isotonic")
+
+    def __init__(self, space, keys=None, method="sort", clip=True):
+        """
+        :param space: The :class:`DataFrameSpace` of the predictions, e.g. the action space of the problem.
+        :param keys: The keys of the final spaces that hold quantiles, as tuples of the nested dict keys. Defaults
+                     to all Box spaces with shape (n,) and n > 1.
+        :param method: "sort" to sort the quantiles of each row or "isotonic" for the isotonic projection, which
+                       moves the quantiles the least in squared distance.
+        :param clip: Whether to clip the quantiles to the bounds of the space.
+        """
+        assert method in self.methods, f"Method must be one of {self.methods}."
+        self.space = space
+        self.method = method
+        self.clip = clip
+
+        if keys is None:
+            leaves = [leaf for leaf in space.layout
+                      if isinstance(leaf.space, gym.spaces.Box) and len(leaf.space.shape) == 1 and leaf.size > 1]
+        else:
+            keys = {key if isinstance(key, tuple) else (key,) for key in keys}
+            leaves = [leaf for leaf in space.layout if leaf.key in keys]
+
+        # Group runs of adjacent final spaces of the same size
+        self.groups = []
+        for leaf in leaves:
+            group = self.groups[-1] if self.groups else None
+            if group and group[-1].size == leaf.size and group[-1].position + group[-1].size == leaf.position:
+                group.append(leaf)
+            else:
+                self.groups.append([leaf])
+
+    def repair(self, block, low=None, high=None):
+        """
+        Repair a (rows, spaces, quantiles) array in place.
+        """
+        if self.method == "sort":
+            block.sort(axis=-1)
+        else:
+            flat = block.reshape(-1, block.shape[-1])
+            isotonic_regression(flat)
+            if not np.shares_memory(flat, block):
+                block[...] = flat.reshape(block.shape)
+        if self.clip and low is not None:
+            np.clip(block, low, high, out=block)
+        return block
+
+    def __call__(self, x):
+        """
+        Repair the quantiles of a prediction in place.
+        :param x: A pandas DataFrame with the columns of the space.
+        :return: x
+        """
+        array = x.to_numpy() if x.columns.equals(self.space.columns) else None
+        is_view = array is not None and array.flags.writeable and np.may_share_memory(array, x.to_numpy())
+
+        for group in self.groups:
+            start, size = group[0].position, group[0].size
+            stop = start + len(group) * size
+            low = np.stack([leaf.low for leaf in group])
+            high = np.stack([leaf.high for leaf in group])
+            if is_view and np.issubdtype(array.dtype, np.floating):
+                self.repair(array[:, start:stop].reshape(len(x), len(group), size), low, high)
+            else:
+                columns = [column for leaf in group for column in leaf.columns]
+                block = x.loc[:, columns].to_numpy(dtype=float).reshape(len(x), len(group), size)
+                x.loc[:, columns] = self.repair(block, low, high).reshape(len(x), -1)
+        return x
+
+
+class PostprocessedPredictor(Predictor):
+    """
+    A predictor whose predictions are passed through post-processing stages, e.g. :class:`QuantileRepair`.
+
+    Created with :meth:`Predictor.with_postprocessing`. Other attributes are looked up on the wrapped predictor.
+    """
+    def __init__(self, predictor, *stages):
+        """
+        :param predictor: The predictor to wrap.
+        :param stages: Callables that take a prediction and return the post-processed prediction.
+        """
+        self.predictor = predictor
+        self.stages = list(stages)
+        self.name = getattr(predictor, "name", None)
+
+    def __getattr__(self, name):
+        if name == "predictor":
+            raise AttributeError(name)
+        return getattr(self.predictor, name)
+
+    def train(self, *args, **kwargs):
+        return self.predictor.train(*args, **kwargs)
+
+    def predict(self, input):
+        prediction = self.predictor.predict(input)
+        for stage in self.stages:
+            prediction = stage(prediction)
+        return prediction
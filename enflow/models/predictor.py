@@ -54,6 +54,21 @@ class Predictor(Model, ABC):
         # Implement prediction method here. 
         pass
 
+    def with_postprocessing(self, *stages):
+        """
+        Get a predictor that passes the predictions of this predictor through post-processing stages.
+
+        Parameters:
+            stages: Callables that take a prediction and return the post-processed prediction, e.g.
+                :class:`enflow.models.postprocessing.QuantileRepair`.
+
+        Returns:
+            predictor: A :class:`enflow.models.postprocessing.PostprocessedPredictor`.
+        """
+        from enflow.models.postprocessing import PostprocessedPredictor
+
+        return PostprocessedPredictor(self, *stages)
+
     def copy(self, name=None):
         """
         Create a copy of the predictor.
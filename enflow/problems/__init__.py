@@ -1,4 +1,4 @@
 from .dataset import Dataset
-from .environment import MicroGridEnv, HybridPowerPlantEnv, EnergyCommunityEnv
-from .objective import Objective, MeanSquaredError, PinballLoss
+from .environment import MicroGridEnv, HybridPowerPlantEnv, EnergyCommunityEnv, ValidateAction
+from .objective import Objective, StreamingObjective, MeanSquaredError, MeanAbsoluteError, PinballLoss, CRPS, MultiMetricEvaluator, EnergyCostObjective
 from .problem import Problem
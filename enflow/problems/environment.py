@@ -1,3 +1,7 @@
+import warnings
+import gymnasium as gym
+
+
 class Environment:
     pass
 
@@ -10,4 +14,58 @@ class HybridPowerPlantEnv:
     pass
 
 class EnergyCommunityEnv:
-    pass
\ No newline at end of file
+    pass
+
+
+class ValidateAction(gym.Wrapper):
+    """
+    Wrapper that validates every action passed to step against the action space of the environment.
+
+    With a :class:`DataFrameSpace` action space the action is checked with its configured validation mode, see
+    :meth:`DataFrameSpace.set_validation`, and the violations are counted in its ``validation_stats``. Other
+    spaces are checked with their contains method.
+    """
+
+    def __init__(self, env, mode=None, on_violation="warn"):
+        """
+        :param env: The environment to wrap.
+        :param mode: Optional validation mode ("off", "sampled", "full" or "chunked") that overrides the one set
+                     on the action space.
+        :param on_violation: "warn" to emit a warning, "raise" to raise a ValueError, or "ignore" to only count
+                             the violation.
+        """
+        assert on_violation in ("warn", "raise", "ignore"), "on_violation must be 'warn', 'raise' or 'ignore'."
+        super().__init__(env)
+        self.mode = mode
+        self.on_violation = on_violation
+        self.n_invalid_actions = 0
+
+    def reset(self, **kwargs):
+        # Forward only the given arguments, since environments such as GEFCom2014SolarEnv take no seed or options
+        return self.env.reset(**kwargs)
+
+    def step(self, action):
+        if action is not None:
+            self.validate_action(action)
+        return self.env.step(action)
+
+    def validate_action(self, action):
+        """
+        Validate an action and handle a violation according to on_violation.
+
+        :return: A :class:`ContainsReport` for a :class:`DataFrameSpace` action space, a boolean otherwise.
+        """
+        action_space = self.env.action_space
+        if hasattr(action_space, "validate"):
+            report = action_space.validate(action, mode=self.mode)
+        else:
+            report = action_space.contains(action)
+
+        if not report:
+            self.n_invalid_actions += 1
+            message = f"Action is outside the action space of {self.env}: {report}"
+            if self.on_violation == "raise":
+                raise ValueError(message)
+            if self.on_violation == "warn":
+                warnings.warn(message)
+        return report
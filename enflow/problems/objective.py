@@ -1,20 +1,367 @@
+import os
+import re
 import numpy as np
 import pandas as pd
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+_MAX_RESHAPE_PLANS = 64
+_reshape_plans = {}
+_last_reshape_plan = None
+_quantile_orders = {}
+_QUANTILE_LABEL = re.compile(r"^(?:quantile|q)_?(\d+(?:\.\d*)?)$")
+
+@dataclass(frozen=True)
+class ReshapePlan:
+    """
+    How to turn the values of a DataFrame into an array with one axis per column level.
+
+    :param shape: tuple, the number of unique values of each column level, in order of appearance.
+    :param order: numpy array or None, the column order that sorts the columns into a Cartesian product, or
+                  None if the columns already are.
+    :param labels: tuple of pandas Index, the unique values of each column level, in order of appearance.
+    """
+    shape: tuple
+    order: np.ndarray = None
+    labels: tuple = ()
+
+    def apply(self, frame):
+        """
+        Reshape the values of a DataFrame to (rows,) + shape. The result is a view of the values when the
+        columns are already ordered and the values are row-major, which is the case for frames created by
+        :class:`DataFrameSpace`.
+        """
+        values = frame.to_numpy()
+        if self.order is not None:
+            values = values[:, self.order]
+        return values.reshape((len(frame),) + self.shape)
+
+def reshape_plan(columns):
+    """
+    Get the reshape plan of a column index. Each level is ordered by first appearance, so the inner labels of every
+    group, e.g. the quantiles of each site, are gathered into the order of the first group whatever their order
+    within the group. Plans are cached by the labels of the index, so the index analysis runs once per set of
+    columns, also when a new but equal index is created at every step. The last index is also remembered by
+    identity, which skips hashing the labels when the same index object is passed again.
+    :param columns: pandas Index or MultiIndex.
+    :return: ReshapePlan
+    """
+    global _last_reshape_plan
+    if _last_reshape_plan is not None and _last_reshape_plan[0] is columns:
+        return _last_reshape_plan[1]
+
+    key = (columns.nlevels, tuple(columns))
+    plan = _reshape_plans.get(key)
+    if plan is None:
+        codes, uniques = zip(*(pd.factorize(columns.get_level_values(i)) for i in range(columns.nlevels)))
+        shape = tuple(len(unique) for unique in uniques)
+        positions = np.ravel_multi_index(codes, shape) if len(columns) else np.arange(0)
+        if len(positions) != np.prod(shape) or len(np.unique(positions)) != len(positions):
+            raise ValueError(f"The columns are not a full Cartesian product of their levels with shape {shape}.")
+        order = None if np.array_equal(positions, np.arange(len(positions))) else np.argsort(positions)
+        plan = ReshapePlan(shape, order, tuple(pd.Index(unique) for unique in uniques))
+
+        if len(_reshape_plans) >= _MAX_RESHAPE_PLANS:
+            _reshape_plans.pop(next(iter(_reshape_plans)))
+        _reshape_plans[key] = plan
+    _last_reshape_plan = (columns, plan)
+    return plan
+
+def quantile_order(labels, quantiles):
+    """
+    Get the order of the quantile column labels of a level that matches a list of quantiles. The labels are the
+    levels as numbers between 0 and 1, or strings such as "quantile_10" or "q10" with the level in percent.
+    :param labels: pandas Index, e.g. the last level of the columns of quantile forecasts, see :class:`ReshapePlan`.
+    :param quantiles: numpy array of the quantiles.
+    :return: integer numpy array that gathers the labels into the order of quantiles, a slice of all labels if they
+             already are in that order, or None if they are not quantile levels.
+    """
+    key = (tuple(labels), tuple(quantiles))
+    if key in _quantile_orders:
+        return _quantile_orders[key]
+
+    levels, tolerance = None, 1e-9
+    if pd.api.types.is_numeric_dtype(labels) and np.all((labels > 0) & (labels < 1)):
+        levels = np.asarray(labels, dtype=float)
+    else:
+        matches = [_QUANTILE_LABEL.match(label) if isinstance(label, str) else None for label in labels]
+        if all(matches):
+            # Percent labels are often rounded, e.g. "quantile_33" for 1/3
+            levels, tolerance = np.array([float(match.group(1)) / 100 for match in matches]), 0.005 + 1e-9
+
+    order = None
+    if levels is not None and len(levels) == len(quantiles):
+        order = np.abs(levels[np.newaxis, :] - np.asarray(quantiles)[:, np.newaxis]).argmin(axis=1)
+        if len(np.unique(order)) != len(order) or np.any(np.abs(levels[order] - quantiles) > tolerance):
+            raise ValueError(f"The quantile columns {list(labels)} do not match the quantiles {np.asarray(quantiles).tolist()}.")
+        if np.array_equal(order, np.arange(len(order))):
+            order = slice(None)
+
+    if len(_quantile_orders) >= _MAX_RESHAPE_PLANS:
+        _quantile_orders.pop(next(iter(_quantile_orders)))
+    _quantile_orders[key] = order
+    return order
+
+def to_array(y):
+    """
+    Convert true values or predictions to a numpy array. DataFrames get one axis per column level, see
+    :func:`reshape_plan`.
+    """
+    if isinstance(y, pd.DataFrame):
+        return reshape_plan(y.columns).apply(y)
+    if isinstance(y, pd.Series):
+        return y.to_numpy()
+    return np.asarray(y)
+
+@dataclass
+class BootstrapResult:
+    """
+    The result of :meth:`Objective.bootstrap`.
+
+    :param estimate: float, the objective on the original data.
+    :param low: float, the lower bound of the percentile confidence interval.
+    :param high: float, the upper bound of the percentile confidence interval.
+    :param confidence: float, the confidence level of the interval.
+    :param samples: numpy array, the objective on each resample.
+    """
+    estimate: float
+    low: float
+    high: float
+    confidence: float
+    samples: np.ndarray
+
+    @property
+    def p_value(self):
+        """
+        The two-sided bootstrap p-value of the estimate being zero, e.g. of no difference to a baseline.
+        """
+        return min(1.0, 2 * min(np.mean(self.samples <= 0), np.mean(self.samples >= 0)))
+
+def _bootstrap_blocks(rng, n_rows, n_resamples, block_length, method):
+    """
+    Draw the blocks of bootstrap resamples as index matrices.
+    :return: tuple of (starts, lengths), integer arrays of shape (n_resamples, n_blocks). The blocks of each
+             resample cover exactly n_rows rows.
+    """
+    if method == "moving":
+        block_length = min(block_length, n_rows)
+        n_blocks = -(-n_rows // block_length)
+        starts = rng.integers(0, n_rows - block_length + 1, size=(n_resamples, n_blocks))
+        lengths = np.full((n_resamples, n_blocks), block_length)
+        lengths[:, -1] = n_rows - (n_blocks - 1) * block_length
+        return starts, lengths
+
+    if method == "stationary":
+        n_blocks = 2 * (-(-n_rows // block_length)) + 16
+        starts = rng.integers(0, n_rows, size=(n_resamples, n_blocks))
+        lengths = rng.geometric(1 / block_length, size=(n_resamples, n_blocks))
+        while np.any(lengths.sum(axis=1) < n_rows):
+            starts = np.concatenate([starts, rng.integers(0, n_rows, size=(n_resamples, n_blocks))], axis=1)
+            lengths = np.concatenate([lengths, rng.geometric(1 / block_length, size=(n_resamples, n_blocks))], axis=1)
+        ends = np.cumsum(lengths, axis=1)
+        lengths = np.clip(n_rows - (ends - lengths), 0, lengths)
+        return starts, lengths
+
+    raise ValueError(f"Unknown bootstrap method: {method}.")
+
+def _bootstrap_resamples(row_sums, row_counts, seed, n_resamples, block_length, method):
+    """
+    Compute the mean loss of bootstrap resamples from per-row loss sums and counts.
+
+    Blocks may wrap around the end of the rows, which only happens for the stationary bootstrap. The sum of each
+    block is a difference of cumulative sums, so a resample costs one gather per block instead of a pass over
+    the rows.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = len(row_sums)
+    starts, lengths = _bootstrap_blocks(rng, n_rows, n_resamples, block_length, method)
+    ends = starts + lengths
+    cumulative_sums = np.concatenate([[0.0], np.cumsum(np.tile(row_sums, 2))])
+    cumulative_counts = np.concatenate([[0], np.cumsum(np.tile(row_counts, 2))])
+    sums = (cumulative_sums[ends] - cumulative_sums[starts]).sum(axis=1)
+    counts = (cumulative_counts[ends] - cumulative_counts[starts]).sum(axis=1)
+    # A resample of only rows without losses has no mean, it is NaN instead of a division by zero
+    means = np.full(len(sums), np.nan)
+    np.divide(sums, counts, out=means, where=counts > 0)
+    return means
 
 class Objective(ABC):
+    # Attributes that are not part of the running state, e.g. scratch buffers, and are left out of checkpoints
+    transient = ()
+
     @abstractmethod
     def calculate(self):
         """Subclasses must implement this method."""
         pass
 
-class MeanSquaredError(Objective):
-    pass
+    def row_losses(self, *args, **kwargs):
+        """
+        Compute the sum and the number of non-NaN losses of each row, so that the objective is their ratio.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support bootstrapping.")
+
+    bootstrap_chunk_size = 256
+
+    def bootstrap(self, y_true, y_preds, baseline=None, n_resamples=1000, block_length=24, method="moving",
+                  confidence=0.95, seed=None, n_workers=None, executor=None):
+        """
+        Compute a block-bootstrap confidence interval of the objective.
+
+        The loss sums of the rows are computed once, and each resample is drawn as a matrix of block indices
+        into their cumulative sums. Resamples are drawn in chunks of bootstrap_chunk_size, each from its own
+        generator spawned from seed, so the result does not depend on n_workers.
+        :param y_true: array-like, true values with the rows in time order.
+        :param y_preds: array-like, predicted values.
+        :param baseline: array-like, optional predictions of a baseline model. The interval is then of the
+                         difference of the objective of y_preds and the objective of baseline, on the same resamples.
+        :param n_resamples: int, the number of bootstrap resamples.
+        :param block_length: int, the length of the blocks, or the mean length for the stationary bootstrap.
+        :param method: str, "moving" for the moving-block bootstrap or "stationary" for the stationary bootstrap.
+        :param confidence: float, the confidence level of the interval.
+        :param seed: int or numpy SeedSequence, the seed of the resamples.
+        :param n_workers: int, optional number of worker processes to draw the resamples in.
+        :param executor: concurrent.futures.Executor, optional executor to use instead of a new process pool.
+        :return: BootstrapResult. Resamples that only drew rows without losses, e.g. all NaN, are left out of its
+                 samples and interval.
+        """
+        assert 0 < confidence < 1, "Confidence must be between 0 and 1."
+        assert block_length >= 1, "Block length must be at least 1."
+        row_sums, row_counts = self.row_losses(y_true, y_preds)
+        if baseline is not None:
+            baseline_sums, baseline_counts = self.row_losses(y_true, baseline)
+            assert np.array_equal(row_counts, baseline_counts), "Predictions and baseline must have the same missing values."
+            row_sums = row_sums - baseline_sums
+        if row_counts.sum() == 0:
+            raise ValueError("There are no non-NaN losses to bootstrap.")
+        estimate = row_sums.sum() / row_counts.sum()
+
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        chunks = [min(self.bootstrap_chunk_size, n_resamples - start) for start in range(0, n_resamples, self.bootstrap_chunk_size)]
+        seeds = seed_sequence.spawn(len(chunks))
+        arguments = [(row_sums, row_counts, chunk_seed, chunk, block_length, method) for chunk_seed, chunk in zip(seeds, chunks)]
+
+        if executor is None and (n_workers is None or n_workers <= 1 or len(chunks) == 1):
+            samples = [_bootstrap_resamples(*argument) for argument in arguments]
+        elif executor is not None:
+            samples = list(executor.map(_bootstrap_resamples, *zip(*arguments)))
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_workers, len(chunks), os.cpu_count() or 1)) as pool:
+                samples = list(pool.map(_bootstrap_resamples, *zip(*arguments)))
+        samples = np.concatenate(samples) if samples else np.empty(0)
+        samples = samples[~np.isnan(samples)]
+        if not len(samples):
+            raise ValueError("Every bootstrap resample only drew rows without losses.")
+
+        alpha = (1 - confidence) / 2
+        low, high = np.quantile(samples, [alpha, 1 - alpha])
+        return BootstrapResult(float(estimate), float(low), float(high), confidence, samples)
+
+class StreamingObjective(ABC):
+    """
+    Interface of objectives that can be evaluated chunk by chunk, e.g. one step of an experiment at a time, with
+    :meth:`reset`, :meth:`update` and :meth:`result`, without keeping the data of past chunks.
+    """
+
+    @abstractmethod
+    def reset(self):
+        """
+        Reset the running state used by :meth:`update` and :meth:`result`.
+        """
+
+    @abstractmethod
+    def update(self, *args, **kwargs):
+        """
+        Add a chunk of data to the running state, e.g. the data of one step of an experiment.
+        """
+
+    @abstractmethod
+    def result(self, *args, **kwargs):
+        """
+        Compute the objective over all the chunks passed to :meth:`update` since the last :meth:`reset`.
+        """
+
+class PointErrorObjective(Objective, StreamingObjective):
+    """
+    Base class of objectives that average a loss of the point errors y_true - y_pred.
+    """
+    def __init__(self):
+        self._name = type(self).__name__
+        self.reset()
 
-class MeanAbsoluteError(Objective):
-    pass
+    @property
+    def name(self):
+        return self._name
+
+    @abstractmethod
+    def loss(self, errors):
+        """
+        Compute the losses of an array of errors, in place if possible.
+        """
+        pass
+
+    def _errors(self, y_true, y_pred):
+        y_true, y_pred = to_array(y_true), to_array(y_pred)
+        assert len(y_true) == len(y_pred), "Number of true values must match the number of predictions."
+        return np.subtract(y_true, y_pred, dtype=np.result_type(y_true.dtype, y_pred.dtype, np.float32))
+
+    def calculate(self, y_true, y_pred, mean=True):
+        """
+        Compute the loss between true values and point predictions.
+        :param y_true: array-like, true values.
+        :param y_pred: array-like, predicted values with the same shape as y_true.
+        :param mean: bool, whether to return the mean loss instead of the losses.
+        :return: float or numpy array.
+        """
+        losses = self.loss(self._errors(y_true, y_pred))
+        return np.nanmean(losses) if mean else losses
+
+    def reset(self):
+        """
+        Reset the running sum and count of the streaming evaluation.
+        """
+        self._sum = 0.0
+        self._count = 0
+        return self
+
+    def update(self, y_true, y_pred):
+        """
+        Add a chunk of true values and point predictions to the running sum and count.
+        """
+        losses = self.loss(self._errors(y_true, y_pred))
+        self._sum += np.nansum(losses, dtype=np.float64)
+        self._count += np.count_nonzero(~np.isnan(losses))
+        return self
+
+    def result(self):
+        """
+        Compute the mean loss over all chunks passed to :meth:`update`.
+        """
+        if not self._count:
+            raise ValueError("No data has been added with update.")
+        return self._sum / self._count
+
+    def row_losses(self, y_true, y_pred):
+        """
+        Compute the sum and the number of non-NaN losses of each row.
+        """
+        losses = self.loss(self._errors(y_true, y_pred))
+        losses = losses.reshape(len(losses), -1)
+        missing = np.isnan(losses)
+        return np.where(missing, 0, losses).sum(axis=1, dtype=np.float64), (~missing).sum(axis=1)
+
+class MeanSquaredError(PointErrorObjective):
+    def loss(self, errors):
+        return np.square(errors, out=errors)
+
+class MeanAbsoluteError(PointErrorObjective):
+    def loss(self, errors):
+        return np.abs(errors, out=errors)
+
+class PinballLoss(Objective, StreamingObjective):
+    chunk_size = 32768
+    transient = ("_scratch",)
 
-class PinballLoss(Objective):
     def __init__(self, quantiles):
         """
         Initialize with multiple quantiles.
@@ -25,38 +372,645 @@ class PinballLoss(Objective):
             raise ValueError("Quantile values must be between 0 and 1.")
 
         self._name = "PinballLoss"
+        # The order that gathers the columns of predictions without quantile labels into the order of quantiles
+        self._column_order = None
+        self._scratch = {}
+        self.reset()
 
     @property
     def name(self):
         return self._name
 
-    def calculate(self, y_true, y_preds, mean=True):
+    def _prepare(self, y_true, y_preds):
         """
-        Compute the pinball loss between true values and multiple sets of predictions.
-        Each set of predictions corresponds to a specific quantile.
-        :param y_true: array-like, true values.
-        :param y_preds: 2D array-like, predicted values for each quantile. Shape: (n_samples, n_quantiles).
-        :return: numpy array, the pinball losses for each quantile.
+        Convert the true values and predictions to numpy arrays that broadcast against each other.
         """
-
         if isinstance(y_true, list):
             y_true = np.array(y_true)
         if isinstance(y_preds, list):
             y_preds = np.array(y_preds)
         if isinstance(y_true, pd.DataFrame):
-            shape = (len(y_true),) + tuple(len(y_true.columns.get_level_values(i).unique()) for i in range(y_true.columns.nlevels))
-            y_true = y_true.values.reshape(shape)
+            y_true = reshape_plan(y_true.columns).apply(y_true)
+        order = self._column_order
         if isinstance(y_preds, pd.DataFrame):
-            shape = (len(y_preds),) + tuple(len(y_preds.columns.get_level_values(i).unique()) for i in range(y_preds.columns.nlevels))
-            y_preds = y_preds.values.reshape(shape)
+            plan = reshape_plan(y_preds.columns)
+            # Columns labeled with their quantile levels are matched to the quantiles, whatever their order
+            labeled_order = quantile_order(plan.labels[-1], self.quantiles)
+            if labeled_order is not None:
+                order = labeled_order
+            y_preds = plan.apply(y_preds)
 
         assert len(y_true) == y_preds.shape[0], "Number of true values must match the number of predictions."
         assert y_preds.shape[-1] == len(self.quantiles), f"Number of prediction sets {y_preds.shape[1]} must match the number of quantiles {len(self.quantiles)}."
+        if order is not None:
+            y_preds = y_preds[..., order]
+
+        # One true value per row of predictions, e.g. shape (n_samples,) against (n_samples, n_quantiles)
+        if y_true.ndim == y_preds.ndim - 1:
+            y_true = y_true[..., np.newaxis]
+
+        return y_true, y_preds
+
+    def calculate(self, y_true, y_preds, mean=True, out=None, dtype=None):
+        """
+        Compute the pinball loss between true values and multiple sets of predictions.
+        Each set of predictions corresponds to a specific quantile.
 
-        errors = y_true - y_preds
-        losses = np.where(errors > 0, self.quantiles * errors, (self.quantiles - 1) * errors)
+        The losses are computed in chunks of about chunk_size elements into reused buffers, so the mean is
+        reduced without materializing the full loss tensor and float32 inputs are not upcast. The mean is reduced
+        with :meth:`_accumulate`, as in :meth:`result`.
+        :param y_true: array-like, true values.
+        :param y_preds: 2D array-like, predicted values for each quantile. Shape: (n_samples, n_quantiles).
+        :param mean: bool, whether to return the mean loss instead of the losses.
+        :param out: numpy array, optional buffer for the losses when mean is False.
+        :param dtype: numpy dtype, optional dtype of the computation. Defaults to the floating dtype of the inputs.
+        :return: numpy array, the pinball losses for each quantile.
+        """
+        y_true, y_preds = self._prepare(y_true, y_preds)
 
         if mean:
-            return np.nanmean(losses)
+            total, count = 0.0, 0
+            for _, _, losses in self._loss_chunks(y_true, y_preds, dtype=dtype):
+                total, count = self._accumulate(total, count, losses)
+            return np.float64(total / count) if count else np.float64(np.nan)
+
+        if out is None:
+            out = np.empty(np.broadcast_shapes(y_true.shape, y_preds.shape), dtype=self._dtype(y_true, y_preds, dtype))
+        for _ in self._loss_chunks(y_true, y_preds, out=out, dtype=dtype):
+            pass
+        return out
+
+    def _dtype(self, y_true, y_preds, dtype=None):
+        """
+        Get the dtype of the computation, keeping float32 inputs in float32.
+        """
+        if dtype is not None:
+            return np.dtype(dtype)
+        dtype = np.result_type(y_true.dtype, y_preds.dtype)
+        return dtype if np.issubdtype(dtype, np.floating) else np.dtype(np.float64)
+
+    def _buffers(self, shape, dtype):
+        """
+        Get two scratch buffers of the given shape and dtype, reused across calls.
+        """
+        key = (shape, dtype)
+        buffers = self._scratch.get(key)
+        if buffers is None:
+            buffers = (np.empty(shape, dtype=dtype), np.empty(shape, dtype=dtype))
+            self._scratch = {key: buffers}
+        return buffers
+
+    def _accumulate(self, total, count, losses):
+        """
+        Add the losses of a chunk of rows to a running total and count of non-NaN losses.
+
+        Each row is summed on its own and the row sums are added to the total strictly from left to right, so the
+        total does not depend on how the rows are split into chunks, by :meth:`_loss_chunks` or into calls of
+        :meth:`update`.
+        """
+        losses = losses.reshape(len(losses), -1)
+        row_sums = losses.sum(axis=1, dtype=np.float64)
+        count += losses.size
+        nan_rows = np.isnan(row_sums)
+        if nan_rows.any():
+            row_sums[nan_rows] = np.nansum(losses[nan_rows], axis=1, dtype=np.float64)
+            count -= np.count_nonzero(np.isnan(losses[nan_rows]))
+        return np.add.accumulate(np.concatenate(([total], row_sums)))[-1], count
+
+    def _loss_chunks(self, y_true, y_preds, out=None, dtype=None):
+        """
+        Compute the pinball losses chunk by chunk of rows.
+
+        The loss is evaluated as q * e - min(e, 0) with e = y_true - y_preds, which equals the usual two-branch
+        definition, using two chunk-sized buffers and no temporaries.
+        :param out: numpy array, optional buffer for all losses. Chunks are written into views of it.
+        :return: iterator of (start, stop, losses) with the losses of rows start to stop.
+        """
+        shape = np.broadcast_shapes(y_true.shape, y_preds.shape)
+        dtype = self._dtype(y_true, y_preds, dtype)
+        if out is not None:
+            assert out.shape == shape, f"Shape of out {out.shape} must be {shape}."
+        quantiles = self.quantiles.astype(dtype)
+
+        n_rows = shape[0]
+        row_size = int(np.prod(shape[1:]))
+        chunk_rows = max(1, min(n_rows, self.chunk_size // max(row_size, 1)))
+        errors_buffer, losses_buffer = self._buffers((chunk_rows,) + shape[1:], dtype)
+
+        for start in range(0, n_rows, chunk_rows):
+            stop = min(start + chunk_rows, n_rows)
+            rows = stop - start
+            errors = errors_buffer[:rows]
+            losses = out[start:stop] if out is not None else losses_buffer[:rows]
+
+            np.subtract(y_true[start:stop], y_preds[start:stop], out=errors, dtype=dtype, casting="unsafe")
+            np.multiply(errors, quantiles, out=losses)
+            np.minimum(errors, 0, out=errors)
+            np.subtract(losses, errors, out=losses)
+            yield start, stop, losses
+
+    def reset(self):
+        """
+        Reset the running sums and counts of the streaming evaluation.
+        """
+        self._sum = None
+        self._count = None
+        self._total = 0.0
+        self._total_count = 0
+        return self
+
+    def update(self, y_true, y_preds):
+        """
+        Add a chunk of true values and predictions to the running sums and counts.
+
+        Only the sums and counts of non-NaN losses per site and quantile are kept, so memory does not grow
+        with the number of chunks.
+        :param y_true: array-like, true values of the chunk. Same formats as :meth:`calculate`.
+        :param y_preds: array-like, predicted values of the chunk for each quantile.
+        """
+        y_true, y_preds = self._prepare(y_true, y_preds)
+        shape = np.broadcast_shapes(y_true.shape, y_preds.shape)[1:]
+        chunk_sum = np.zeros(shape)
+        chunk_count = np.zeros(shape, dtype=np.int64)
+        for start, stop, losses in self._loss_chunks(y_true, y_preds):
+            self._total, self._total_count = self._accumulate(self._total, self._total_count, losses)
+            nan = np.isnan(losses)
+            if nan.any():
+                chunk_sum += np.nansum(losses, axis=0, dtype=np.float64)
+                chunk_count += (stop - start) - np.count_nonzero(nan, axis=0)
+            else:
+                chunk_sum += losses.sum(axis=0, dtype=np.float64)
+                chunk_count += stop - start
+
+        if self._sum is None:
+            self._sum = np.zeros(chunk_sum.shape)
+            self._count = np.zeros(chunk_count.shape, dtype=np.int64)
+        self._sum += chunk_sum
+        self._count += chunk_count
+        return self
+
+    def result(self, by=None):
+        """
+        Compute the mean pinball loss over all chunks passed to :meth:`update`.
+
+        The overall mean is reduced in the same order as in :meth:`calculate`, see :meth:`_accumulate`, so it
+        equals :meth:`calculate` on the concatenated chunks exactly, however the rows were split into chunks. The
+        means per quantile or site agree with it up to floating-point rounding.
+        :param by: None for the overall mean, "quantile" for the mean per quantile, "site" for the mean per site
+                   or "site_quantile" for the mean per site and quantile.
+        :return: float or numpy array.
+        """
+        if self._sum is None:
+            raise ValueError("No data has been added with update.")
+
+        if by is None:
+            return np.float64(self._total / self._total_count) if self._total_count else np.float64(np.nan)
+        if by == "quantile":
+            axes = tuple(range(self._sum.ndim - 1))
+            return self._sum.sum(axis=axes) / self._count.sum(axis=axes)
+        if by == "site":
+            return self._sum.sum(axis=-1) / self._count.sum(axis=-1)
+        if by == "site_quantile":
+            return self._sum / self._count
+        raise ValueError(f"Unknown value of by: {by}.")
+
+
+    def row_losses(self, y_true, y_preds):
+        """
+        Compute the sum and the number of non-NaN pinball losses of each row.
+        """
+        y_true, y_preds = self._prepare(y_true, y_preds)
+        sums = np.empty(len(y_preds))
+        counts = np.empty(len(y_preds), dtype=np.int64)
+        for start, stop, losses in self._loss_chunks(y_true, y_preds):
+            losses = losses.reshape(stop - start, -1)
+            missing = np.isnan(losses)
+            np.copyto(losses, 0, where=missing)
+            sums[start:stop] = losses.sum(axis=1, dtype=np.float64)
+            counts[start:stop] = losses.shape[1] - np.count_nonzero(missing, axis=1)
+        return sums, counts
+
+class CRPS(PinballLoss):
+    """
+    The continuous ranked probability score approximated from a set of quantile forecasts.
+
+    Uses CRPS = 2 * integral of the pinball loss over the quantile levels, integrated with the midpoint rule, so
+    that each quantile gets the weight (q[j + 1] - q[j - 1]) / 2 with q[0] = 0 and q[-1] = 1. The quantile axis
+    is reduced chunk by chunk with a matrix-vector product, without materializing the pinball losses.
+
+    The quantiles are kept sorted. Predictions given in the order of unsorted quantiles are gathered into sorted
+    order, and prediction columns labeled with their quantile levels are matched by label.
+    """
+    def __init__(self, quantiles):
+        """
+        :param quantiles: array-like, the quantiles of the predictions. Each must be between 0 and 1.
+        """
+        super().__init__(quantiles)
+        self._name = "CRPS"
+
+        # Keep the quantiles sorted, so that predictions sorted with sort=True stay aligned with their levels and
+        # weights, and gather the prediction columns into the same order
+        order = np.argsort(self.quantiles, kind="stable")
+        self.quantiles = self.quantiles[order]
+        if not np.array_equal(order, np.arange(len(order))):
+            self._column_order = order
+        edges = np.concatenate([[0.0], self.quantiles, [1.0]])
+        self.weights = edges[2:] - edges[:-2]
+
+    def _scores(self, y_true, y_preds, sort=False, dtype=None):
+        """
+        Compute the CRPS chunk by chunk of rows.
+        :return: iterator of (start, stop, scores) with the scores of rows start to stop, without the quantile axis.
+        """
+        if sort:
+            y_preds = np.sort(y_preds, axis=-1)
+        weights = None
+        for start, stop, losses in self._loss_chunks(y_true, y_preds, dtype=dtype):
+            if weights is None:
+                weights = self.weights.astype(losses.dtype)
+            yield start, stop, losses @ weights
+
+    def calculate(self, y_true, y_preds, mean=True, out=None, dtype=None, sort=False):
+        """
+        Compute the CRPS between true values and quantile forecasts.
+        :param y_true: array-like, true values.
+        :param y_preds: array-like, predicted values for each quantile. Shape: (n_samples, ..., n_quantiles).
+        :param mean: bool, whether to return the mean score instead of the scores.
+        :param out: numpy array, optional buffer for the scores when mean is False. Shape: (n_samples, ...).
+        :param dtype: numpy dtype, optional dtype of the computation. Defaults to the floating dtype of the inputs.
+        :param sort: bool, whether to sort the predictions of each row first, which repairs quantile crossing.
+        :return: float or numpy array, the score of each sample.
+        """
+        y_true, y_preds = self._prepare(y_true, y_preds)
+
+        if mean:
+            total, count = 0.0, 0
+            for _, _, scores in self._scores(y_true, y_preds, sort=sort, dtype=dtype):
+                valid = ~np.isnan(scores)
+                total += scores.sum(where=valid, dtype=np.float64)
+                count += np.count_nonzero(valid)
+            return np.float64(total / count) if count else np.float64(np.nan)
+
+        shape = np.broadcast_shapes(y_true.shape, y_preds.shape)[:-1]
+        if out is None:
+            out = np.empty(shape, dtype=self._dtype(y_true, y_preds, dtype))
+        assert out.shape == shape, f"Shape of out {out.shape} must be {shape}."
+        for start, stop, scores in self._scores(y_true, y_preds, sort=sort, dtype=dtype):
+            out[start:stop] = scores
+        return out
+
+    def row_losses(self, y_true, y_preds, sort=False):
+        """
+        Compute the sum and the number of non-NaN scores of each row.
+        """
+        y_true, y_preds = self._prepare(y_true, y_preds)
+        sums = np.empty(len(y_preds))
+        counts = np.empty(len(y_preds), dtype=np.int64)
+        for start, stop, scores in self._scores(y_true, y_preds, sort=sort):
+            scores = scores.reshape(stop - start, -1)
+            valid = ~np.isnan(scores)
+            sums[start:stop] = scores.sum(axis=1, where=valid, dtype=np.float64)
+            counts[start:stop] = np.count_nonzero(valid, axis=1)
+        return sums, counts
+
+    def update(self, y_true, y_preds, sort=False):
+        """
+        Add a chunk of true values and quantile forecasts to the running sums and counts per site.
+        """
+        y_true, y_preds = self._prepare(y_true, y_preds)
+        shape = np.broadcast_shapes(y_true.shape, y_preds.shape)[1:-1]
+        chunk_sum = np.zeros(shape)
+        chunk_count = np.zeros(shape, dtype=np.int64)
+        for _, _, scores in self._scores(y_true, y_preds, sort=sort):
+            valid = ~np.isnan(scores)
+            chunk_sum += scores.sum(axis=0, where=valid, dtype=np.float64)
+            chunk_count += np.count_nonzero(valid, axis=0)
+
+        if self._sum is None:
+            self._sum = np.zeros(shape)
+            self._count = np.zeros(shape, dtype=np.int64)
+        self._sum += chunk_sum
+        self._count += chunk_count
+        return self
+
+    def result(self, by=None):
+        """
+        Compute the mean CRPS over all chunks passed to :meth:`update`.
+        :param by: None for the overall mean or "site" for the mean per site.
+        :return: float or numpy array.
+        """
+        if self._sum is None:
+            raise ValueError("No data has been added with update.")
+
+        if by is None:
+            return self._sum.sum() / self._count.sum()
+        if by == "site":
+            return self._sum / self._count
+        raise ValueError(f"Unknown value of by: {by}.")
+
+def _group_sum(values, codes, n_groups):
+    """
+    Sum the rows of an array per group.
+    :param values: numpy array with rows along the first axis.
+    :param codes: numpy array of the group code of each row, or None for a single group.
+    :param n_groups: int, the number of groups.
+    :return: numpy array of shape (n_groups,) + values.shape[1:].
+    """
+    if codes is None:
+        return values.sum(axis=0, dtype=np.float64)[np.newaxis]
+    n_cells = int(np.prod(values.shape[1:]))
+    index = (codes[:, np.newaxis] * n_cells + np.arange(n_cells)).ravel()
+    sums = np.bincount(index, weights=values.reshape(len(values), -1).ravel(), minlength=n_groups * n_cells)
+    return sums.reshape((n_groups,) + values.shape[1:])
+
+class MultiMetricEvaluator(StreamingObjective):
+    """
+    Evaluate quantile forecasts with several metrics in one pass over the true values and predictions.
+
+    The metrics are the pinball loss, the mean absolute error, mean squared error and bias of the point forecast,
+    and the empirical coverage of the central intervals formed by the quantile pairs (q, 1 - q). The point forecast
+    is the quantile closest to point_quantile. Running sums and counts are kept per period, site and quantile, so
+    chunks can be added with :meth:`update` and broken down with :meth:`result`.
+    """
+    metrics = ("pinball", "mae", "mse", "bias")
+
+    def __init__(self, quantiles, point_quantile=0.5):
+        """
+        :param quantiles: array-like, the quantiles of the predictions. Each must be between 0 and 1.
+        :param point_quantile: float, the quantile used as point forecast.
+        """
+        self.pinball = PinballLoss(quantiles)
+        self.quantiles = self.pinball.quantiles
+        self.point_index = int(np.argmin(np.abs(self.quantiles - point_quantile)))
+
+        lower, upper = [], []
+        for i, quantile in enumerate(self.quantiles):
+            matches = np.flatnonzero(np.isclose(self.quantiles, 1 - quantile))
+            if quantile < 0.5 and len(matches):
+                lower.append(i)
+                upper.append(matches[0])
+        self.lower_index = np.array(lower, dtype=np.intp)
+        self.upper_index = np.array(upper, dtype=np.intp)
+        self.nominal_coverage = 1 - 2 * self.quantiles[self.lower_index]
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the running sums and counts.
+        """
+        self._sums = None
+        self._periods = {}
+        self._sites = None
+        return self
+
+    def _zeros(self, n_groups, n_sites):
+        n_quantiles, n_intervals = len(self.quantiles), len(self.lower_index)
+        return {
+            "pinball": np.zeros((n_groups, n_sites, n_quantiles)),
+            "pinball_count": np.zeros((n_groups, n_sites, n_quantiles)),
+            "absolute": np.zeros((n_groups, n_sites)),
+            "squared": np.zeros((n_groups, n_sites)),
+            "error": np.zeros((n_groups, n_sites)),
+            "point_count": np.zeros((n_groups, n_sites)),
+            "covered": np.zeros((n_groups, n_sites, n_intervals)),
+            "interval_count": np.zeros((n_groups, n_sites, n_intervals)),
+        }
+
+    def _period_codes(self, periods, n_rows):
+        """
+        Map period labels to codes that are stable across updates, growing the sums for new periods.
+        Rows without periods belong to the period None.
+        """
+        if periods is None:
+            codes, labels = np.zeros(n_rows, dtype=np.intp), [None]
         else:
-            return losses
\ No newline at end of file
+            codes, labels = pd.factorize(np.asarray(periods))
+            assert len(codes) == n_rows, "Number of periods must match the number of true values."
+
+        mapping = np.array([self._periods.setdefault(label, len(self._periods)) for label in labels], dtype=np.intp)
+        n_groups = len(self._periods)
+        if self._sums is not None and n_groups > len(self._sums["absolute"]):
+            extra = self._zeros(n_groups - len(self._sums["absolute"]), self._sums["absolute"].shape[1])
+            self._sums = {key: np.concatenate([value, extra[key]]) for key, value in self._sums.items()}
+        return mapping[codes], n_groups
+
+    def update(self, y_true, y_preds, periods=None):
+        """
+        Add a chunk of true values and predictions to the running sums and counts.
+        :param y_true: array-like, true values. Same formats as :meth:`PinballLoss.calculate`.
+        :param y_preds: array-like, predicted values for each quantile.
+        :param periods: array-like or None, a period label for each row, e.g. the month, for breakdowns per period.
+        """
+        if isinstance(y_preds, pd.DataFrame) and y_preds.columns.nlevels > 1 and self._sites is None:
+            self._sites = reshape_plan(y_preds.columns).labels[:-1]
+        y_true, y_preds = self.pinball._prepare(y_true, y_preds)
+        n_rows = len(y_preds)
+        codes, n_groups = self._period_codes(periods, n_rows)
+        if n_groups == 1:
+            codes = None
+
+        n_sites = int(np.prod(y_preds.shape[1:-1]))
+        if self._sums is None:
+            self._sums = self._zeros(n_groups, n_sites)
+        sums = self._sums
+
+        for start, stop, losses in self.pinball._loss_chunks(y_true, y_preds):
+            rows = slice(start, stop)
+            chunk_codes = None if codes is None else codes[rows]
+            shape = (stop - start, n_sites, -1)
+
+            losses = losses.reshape(shape)
+            missing = np.isnan(losses)
+            np.copyto(losses, 0, where=missing)
+            sums["pinball"] += _group_sum(losses, chunk_codes, n_groups)
+            sums["pinball_count"] += _group_sum(~missing, chunk_codes, n_groups)
+
+            truth = np.broadcast_to(y_true[rows], y_preds[rows].shape[:-1] + (1,)).reshape(shape)
+            preds = y_preds[rows].reshape(shape)
+
+            errors = truth[..., 0] - preds[..., self.point_index]
+            missing = np.isnan(errors)
+            errors[missing] = 0
+            sums["absolute"] += _group_sum(np.abs(errors), chunk_codes, n_groups)
+            sums["squared"] += _group_sum(np.square(errors), chunk_codes, n_groups)
+            sums["error"] += _group_sum(errors, chunk_codes, n_groups)
+            sums["point_count"] += _group_sum(~missing, chunk_codes, n_groups)
+
+            lower, upper = preds[..., self.lower_index], preds[..., self.upper_index]
+            covered = (lower <= truth) & (truth <= upper)
+            valid = ~(np.isnan(lower) | np.isnan(upper) | np.isnan(truth))
+            sums["covered"] += _group_sum(covered, chunk_codes, n_groups)
+            sums["interval_count"] += _group_sum(valid, chunk_codes, n_groups)
+        return self
+
+    def evaluate(self, y_true, y_preds, periods=None, by=None):
+        """
+        Evaluate all metrics on the given data, discarding any previous updates.
+        """
+        return self.reset().update(y_true, y_preds, periods=periods).result(by=by)
+
+    def _metrics(self, sums, axis):
+        """
+        Compute the metrics from sums, summing over the given axes of the (period, site) dimensions.
+        """
+        total = {key: value.sum(axis=axis) for key, value in sums.items()}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            metrics = {
+                "pinball": total["pinball"].sum(axis=-1) / total["pinball_count"].sum(axis=-1),
+                "mae": total["absolute"] / total["point_count"],
+                "mse": total["squared"] / total["point_count"],
+                "bias": total["error"] / total["point_count"],
+            }
+            coverage = total["covered"] / total["interval_count"]
+        for i, nominal in enumerate(self.nominal_coverage):
+            metrics[f"coverage_{nominal:.2g}"] = coverage[..., i]
+        return metrics
+
+    def result(self, by=None):
+        """
+        Compute the metrics over all chunks passed to :meth:`update`.
+        :param by: None for the overall metrics, "site", "period" or "quantile" for a breakdown. The quantile
+                   breakdown holds the pinball loss per quantile.
+        :return: pandas Series for the overall metrics, otherwise a pandas DataFrame with a row per site, period or
+                 quantile.
+        """
+        if self._sums is None:
+            raise ValueError("No data has been added with update.")
+
+        if by is None:
+            return pd.Series({key: float(value) for key, value in self._metrics(self._sums, axis=(0, 1)).items()})
+        if by == "site":
+            if self._sites is None:
+                index = pd.RangeIndex(self._sums["absolute"].shape[1], name="site")
+            else:
+                index = self._sites[0] if len(self._sites) == 1 else pd.MultiIndex.from_product(self._sites)
+            return pd.DataFrame(self._metrics(self._sums, axis=0), index=index)
+        if by == "period":
+            index = pd.Index(list(self._periods), name="period")
+            return pd.DataFrame(self._metrics(self._sums, axis=1), index=index)
+        if by == "quantile":
+            pinball = self._sums["pinball"].sum(axis=(0, 1)) / self._sums["pinball_count"].sum(axis=(0, 1))
+            return pd.DataFrame({"pinball": pinball}, index=pd.Index(self.quantiles, name="quantile"))
+        raise ValueError(f"Unknown value of by: {by}.")
+
+class EnergyCostObjective(Objective, StreamingObjective):
+    """
+    The cost of trading energy with the grid, vectorized over time steps and e.g. buildings.
+
+    A positive grid trade is an export, which earns the export price minus the export tariff, and a negative grid
+    trade is an import, which costs the import price plus the import tariff. Prices and tariffs can be scalars,
+    one value per time step or arrays that broadcast against the grid trade.
+    """
+    def __init__(self, import_tariff=0.0, export_tariff=0.0):
+        """
+        :param import_tariff: float or array-like, the tariff per unit of imported energy, e.g. a grid fee.
+        :param export_tariff: float or array-like, the tariff per unit of exported energy.
+        """
+        self.import_tariff = import_tariff
+        self.export_tariff = export_tariff
+        self._name = "EnergyCost"
+        self.reset()
+
+    @property
+    def name(self):
+        return self._name
+
+    @staticmethod
+    def _align(values, grid_trade):
+        """
+        Convert prices or tariffs to an array that broadcasts against the grid trade, with time along the first axis.
+        A 1-D array against a grid trade with more dimensions is one value per time step if its length is the number
+        of time steps, and otherwise broadcasts along the last axis, e.g. one value per building.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1 and grid_trade.ndim > 1 and len(values) == grid_trade.shape[0]:
+            values = values.reshape((-1,) + (1,) * (grid_trade.ndim - 1))
+        try:
+            np.broadcast_shapes(values.shape, grid_trade.shape)
+        except ValueError:
+            expected = f"(), ({grid_trade.shape[0]},) with one value per time step"
+            if grid_trade.ndim > 1:
+                expected += f", ({grid_trade.shape[-1]},) with one value per column"
+            raise ValueError(f"Prices and tariffs of shape {values.shape} do not broadcast against the grid trade of "
+                             f"shape {grid_trade.shape}. Expected a shape of {expected}, or one that broadcasts "
+                             f"against {grid_trade.shape}.") from None
+        return values
+
+    def costs(self, grid_trade, export_price, import_price):
+        """
+        Compute the cost of each grid trade.
+        :param grid_trade: array-like, the energy traded with the grid. Shape: (n_steps,) or (n_steps, ...).
+        :param export_price: float or array-like, the price of exported energy, e.g. the wholesale price.
+        :param import_price: float or array-like, the price of imported energy, e.g. the retail price.
+        :return: numpy array of the same shape as grid_trade, or a float for a scalar grid trade.
+        """
+        grid_trade = to_array(grid_trade).astype(float, copy=False)
+        export_price = self._align(export_price, grid_trade) - self._align(self.export_tariff, grid_trade)
+        import_price = self._align(import_price, grid_trade) + self._align(self.import_tariff, grid_trade)
+        costs = np.where(grid_trade > 0, export_price, import_price)
+        np.multiply(costs, grid_trade, out=costs)
+        np.negative(costs, out=costs)
+        return costs if costs.ndim else float(costs)
+
+    def calculate(self, grid_trade, export_price, import_price, periods=None):
+        """
+        Compute the total cost over all time steps, or per period.
+        :param grid_trade: array-like, pandas Series or DataFrame, the energy traded with the grid with time along
+                           the first axis.
+        :param export_price: float or array-like, the price of exported energy.
+        :param import_price: float or array-like, the price of imported energy.
+        :param periods: array-like of a period label per time step, or a pandas frequency string such as "D" or "M"
+                        when grid_trade has a DatetimeIndex.
+        :return: the total cost, per column of grid_trade if it has several. With periods, the cost per period as a
+                 pandas Series or DataFrame indexed by the period labels.
+        """
+        costs = self.costs(grid_trade, export_price, import_price)
+        columns = grid_trade.columns if isinstance(grid_trade, pd.DataFrame) else None
+
+        if periods is None:
+            total = costs.sum(axis=0)
+            if columns is not None:
+                return pd.Series(total.reshape(len(columns)), index=columns)
+            return total if total.ndim else float(total)
+
+        if isinstance(periods, str):
+            periods = grid_trade.index.to_period(periods)
+        codes, labels = pd.factorize(np.asarray(periods))
+        assert len(codes) == len(costs), "Number of periods must match the number of time steps."
+        totals = _group_sum(costs, codes, len(labels))
+        index = pd.Index(labels, name="period")
+        if totals.ndim == 1:
+            return pd.Series(totals, index=index)
+        return pd.DataFrame(totals.reshape(len(labels), -1), index=index, columns=columns)
+
+    def reset(self):
+        """
+        Reset the running total of the incremental mode.
+        """
+        self._total = 0.0
+        self._n_steps = 0
+        return self
+
+    def update(self, grid_trade, export_price, import_price, time_axis=None):
+        """
+        Compute the cost of one time step, e.g. inside the step loop of an environment, and add it to the running
+        total. The grid trade can be a scalar or an array, e.g. one value per building.
+        :param time_axis: int, optional axis of grid_trade along time, when a step covers several time steps, e.g.
+                          the horizon of a rolling optimization. The costs are summed over this axis before they are
+                          added to the running total, which keeps one value, or one per building.
+        :return: the cost of the step, per time step if time_axis is given.
+        """
+        costs = self.costs(grid_trade, export_price, import_price)
+        if time_axis is None:
+            self._total = self._total + costs
+            self._n_steps += 1
+        else:
+            self._total = self._total + np.sum(costs, axis=time_axis)
+            self._n_steps += np.shape(costs)[time_axis]
+        return costs
+
+    def result(self):
+        """
+        Get the total cost of all steps passed to :meth:`update`.
+        """
+        return self._total
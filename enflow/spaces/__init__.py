@@ -1,4 +1,5 @@
-from .base import BaseSpace
+from .batch import SpaceBatch
+from .base import BaseSpace, fast_space
 from .input import InputSpace, StateSpace
 from .output import OutputSpace, ActionSpace
-from .dataframe import DataFrameSpace
\ No newline at end of file
+from .dataframe import DataFrameSpace, ContainsReport, LeafLayout, ValidationStats
\ No newline at end of file
@@ -1,12 +1,16 @@
+import warnings
 from dataclasses import dataclass, fields
 import numpy as np
 
+from enflow.spaces.batch import SpaceBatch, field_names
+
 @dataclass
 class BaseSpace:
     """
     A base space with methods for converting data formats.
 
     """
+    __slots__ = ()
 
     @classmethod
     def from_array(cls, input_array: np.ndarray) -> "BaseSpace":
@@ -47,4 +51,87 @@ class BaseSpace:
 
     @property
     def tuple(self) -> tuple:
-        return self.to_tuple()
\ No newline at end of file
+        return self.to_tuple()
+
+    @classmethod
+    def batch(cls, instances, dtype=np.float64) -> SpaceBatch:
+        """
+        Stack instances into a :class:`SpaceBatch` backed by one 2-D array.
+        """
+        return SpaceBatch.from_instances(cls, instances, dtype=dtype)
+
+    @classmethod
+    def batch_from_array(cls, input_array: np.ndarray) -> SpaceBatch:
+        """
+        Create a :class:`SpaceBatch` from a 2-D numpy array with one row per instance.
+        """
+        return SpaceBatch.from_array(cls, input_array)
+
+
+def fast_space(cls=None, /, *, slots=True):
+    """
+    Class decorator that compiles the conversion methods of a :class:`BaseSpace` or :class:`BaseVector` subclass.
+
+    Use it in place of ``@dataclass``. The class is made a dataclass with ``__slots__``, its field order is
+    resolved once, and ``to_tuple``, ``to_array``, ``from_tuple`` and ``from_array`` (or ``vector`` and
+    ``from_vector`` for a :class:`BaseVector`) are replaced by functions generated for its fields, which
+    neither call ``fields()`` nor go through ``__init__``.
+
+    Example::
+
+        @fast_space
+        class BatteryState(StateSpace):
+            soc: float
+            price: float
+    """
+    def wrap(cls):
+        if "__dataclass_fields__" not in cls.__dict__:
+            cls = dataclass(cls, slots=slots)
+        elif slots and "__slots__" not in cls.__dict__:
+            warnings.warn(f"{cls.__name__} is already a dataclass, so fast_space cannot add __slots__ to it. Use "
+                          f"@fast_space in place of @dataclass, or @fast_space(slots=False) to keep it without slots.")
+        _compile_conversions(cls)
+        return cls
+
+    if cls is None:
+        return wrap
+    return wrap(cls)
+
+
+def _compile_conversions(cls):
+    """
+    Generate and attach the conversion methods of a dataclass, specialized for its fields.
+    """
+    names = field_names(cls)
+    params = cls.__dataclass_params__
+    all_init = all(field.init for field in fields(cls))
+
+    values = "".join(f"self.{name}, " for name in names)
+    if all_init and not params.frozen and not hasattr(cls, "__post_init__"):
+        # Assign the fields directly instead of calling __init__. Fewer values than fields go through __init__,
+        # so that the remaining fields get their defaults
+        build = (f"    if len(values) != {len(names)}:\n        return cls(*values)\n"
+                 f"    self = _new(cls)\n" + (f"    {values}= values\n" if names else "") + "    return self\n")
+    else:
+        build = "    return cls(*values)\n"
+
+    source = (
+        f"def to_tuple(self):\n    return ({values})\n"
+        f"def to_array(self):\n    return np.array(({values}))\n"
+        f"def build(cls, values):\n{build}"
+        f"def from_vector(cls, values):\n"
+        f"    if len(values) != {len(names)}:\n"
+        f"        raise ValueError('State vector and attribute names must have the same length')\n"
+        f"{build}"
+    )
+    namespace = {"np": np, "_new": object.__new__}
+    exec(source, namespace)
+
+    if hasattr(cls, "from_vector"):
+        cls.vector = property(namespace["to_array"])
+        cls.from_vector = classmethod(namespace["from_vector"])
+    else:
+        cls.to_tuple = namespace["to_tuple"]
+        cls.to_array = namespace["to_array"]
+        cls.from_tuple = classmethod(namespace["build"])
+        cls.from_array = classmethod(namespace["build"])
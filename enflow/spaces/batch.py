@@ -0,0 +1,105 @@
+import functools
+import itertools
+import operator
+from dataclasses import fields
+import numpy as np
+
+
+@functools.lru_cache(maxsize=None)
+def field_names(cls) -> tuple:
+    """
+    Get the field names of a dataclass in definition order, computed once per class.
+    """
+    return tuple(field.name for field in fields(cls))
+
+
+@functools.lru_cache(maxsize=None)
+def _field_getter(cls):
+    """
+    Get a function that returns the field values of an instance as a tuple, computed once per class.
+    """
+    names = field_names(cls)
+    if len(names) == 1:
+        getter = operator.attrgetter(names[0])
+        return lambda instance: (getter(instance),)
+    return operator.attrgetter(*names)
+
+
+class SpaceBatch:
+    """
+    A batch of N instances of a :class:`BaseSpace` or :class:`BaseVector` subclass, stored as one 2-D array.
+
+    Row i holds the field values of instance i and column j holds field j in definition order. Fields can be
+    accessed by name, e.g. ``batch["soc"]`` or ``batch.soc``, which returns a view of the column.
+    """
+
+    def __init__(self, cls, array):
+        """
+        :param cls: The dataclass of the instances, e.g. a subclass of :class:`StateSpace`.
+        :param array: An array-like of shape (N, number of fields).
+        """
+        self.cls = cls
+        self.fields = field_names(cls)
+        self.array = np.asarray(array)
+        if self.array.ndim != 2 or self.array.shape[1] != len(self.fields):
+            raise ValueError(f"Array of shape {self.array.shape} does not match the {len(self.fields)} fields of {cls.__name__}.")
+        self._index = {name: i for i, name in enumerate(self.fields)}
+
+    @classmethod
+    def from_instances(cls, space_cls, instances, dtype=np.float64):
+        """
+        Create the batch from an iterable of instances, filling a single preallocated array.
+        """
+        instances = list(instances)
+        getter = _field_getter(space_cls)
+        n_fields = len(field_names(space_cls))
+        values = itertools.chain.from_iterable(map(getter, instances))
+        array = np.fromiter(values, dtype=dtype, count=len(instances) * n_fields)
+        return cls(space_cls, array.reshape(len(instances), n_fields))
+
+    @classmethod
+    def from_array(cls, space_cls, input_array):
+        """
+        Create the batch from a 2-D numpy array without copying it.
+        """
+        return cls(space_cls, input_array)
+
+    def to_array(self) -> np.ndarray:
+        """
+        Get the batch as a 2-D numpy array of shape (N, number of fields).
+        """
+        return self.array
+
+    def to_instances(self) -> list:
+        """
+        Convert the batch to a list of instances.
+        """
+        return [self.cls(*row) for row in self.array.tolist()]
+
+    def __len__(self):
+        return len(self.array)
+
+    def __iter__(self):
+        return iter(self.to_instances())
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.array[:, self._index[key]]
+        if isinstance(key, (int, np.integer)):
+            return self.cls(*self.array[key].tolist())
+        return SpaceBatch(self.cls, self.array[key])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, str):
+            self.array[:, self._index[key]] = value
+        else:
+            self.array[key] = value
+
+    def __getattr__(self, name):
+        index = self.__dict__.get("_index", {})
+        if name in index:
+            return self.array[:, index[name]]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __repr__(self):
+        return f"SpaceBatch({self.cls.__name__}, n={len(self)}, fields={list(self.fields)})"
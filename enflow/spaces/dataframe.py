@@ -1,25 +1,129 @@
+import typing as t
+import os
+import sys
+import json
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 import gymnasium
 import pandas as pd
 import numpy as np
-from gymnasium.spaces import Space, Dict, Box
+from gymnasium.spaces import Space, Dict, Box, Discrete
+from gymnasium.spaces.utils import flatdim, flatten, flatten_space, unflatten
+
+
+@dataclass
+class ContainsReport:
+    """
+    The outcome of checking a DataFrame against a :class:`DataFrameSpace`.
+
+    Evaluates to the same boolean as :meth:`DataFrameSpace.contains`.
+    """
+    valid: bool
+    missing_columns: t.List[tuple] = field(default_factory=list)
+    invalid_columns: t.List[tuple] = field(default_factory=list)
+    invalid_rows: t.Optional[pd.Index] = None
+    n_violations: int = 0
+
+    def __bool__(self):
+        return self.valid
+
+
+@dataclass
+class ValidationStats:
+    """
+    Counters of the checks made by :meth:`DataFrameSpace.validate`.
+    """
+    n_checks: int = 0
+    n_skipped: int = 0
+    n_invalid: int = 0
+    n_violations: int = 0
+
+
+VALIDATION_MODES = ("off", "sampled", "full", "chunked")
+
+
+@dataclass(frozen=True)
+class LeafLayout:
+    """
+    The columns, bounds and flat position of one final space (e.g., Box, Discrete) in a :class:`DataFrameSpace`.
+    """
+    key: tuple
+    space: Space
+    columns: t.List[tuple]
+    dtype: np.dtype
+    low: np.ndarray
+    high: np.ndarray
+    integral: bool
+    vectorized: bool
+    position: int
+
+    @property
+    def size(self):
+        return len(self.columns)
+
+    @property
+    def slice(self):
+        return slice(self.position, self.position + self.size)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("The arrow backend of DataFrameSpace requires pyarrow. "
+                          "Install it with `pip install enflow[arrow]`.") from e
+    return pyarrow
+
+
+def _is_arrow(x):
+    """
+    Check if x is a pyarrow RecordBatch or Table, without importing pyarrow.
+    """
+    pa = sys.modules.get("pyarrow")
+    return pa is not None and isinstance(x, (pa.RecordBatch, pa.Table))
+
 
 class DataFrameSpace(Space):
-    def __init__(self, space_dict):
+    # Number of rows drawn from each generator by sample_rows and sample_parallel
+    sample_block_size = 4096
+
+    def __init__(self, space_dict, backend="pandas"):
         """
         Initialize the DataFrameSpace with a dictionary or gym.spaces.Dict.
-        
+
         :param space_dict: A Python dictionary or gym.spaces.Dict where each key maps to a space for a column.
                            A nested dictionary will be converted to a two-level multiindex column.
+                           A spaces.Box with a shape of (n,) creates n columns, named "<key>_1" to "<key>_n".
+        :param backend: "pandas" to sample pandas DataFrames, or "arrow" to sample pyarrow RecordBatches with a
+                        flat schema, see :attr:`arrow_schema`. Both kinds of values can be checked and converted
+                        whatever the backend.
         """
-        #TODO: make it possible to pass a spaces.Box with a shape of (n,) to create n columns
-          
         assert isinstance(space_dict, (dict, Dict)), "Input must be a Python dict or gym.spaces.Dict."
+        assert backend in ("pandas", "arrow"), "Backend must be 'pandas' or 'arrow'."
+        self.backend = backend
         
         # Convert any nested dicts into gym.spaces.Dict
         self.space_dict = self._convert_to_space_dict(space_dict)
         
-        # Build the column structure from the dict, handling potential nested dicts
-        self.columns = pd.MultiIndex.from_tuples(self._build_columns(self.space_dict))
+        # Resolve every final space once, so that sampling and checks do not traverse the space_dict
+        self.layout = self._build_layout(self.space_dict)
+        self._leaf_by_key = {leaf.key: leaf for leaf in self.layout}
+
+        # Build the column structure from the layout, handling potential nested dicts
+        self.columns = pd.MultiIndex.from_tuples([col for leaf in self.layout for col in leaf.columns])
+        self._column_leaves = [leaf for leaf in self.layout for _ in leaf.columns]
+        self.arrow_names = ["/".join(map(str, col)) for leaf in self.layout for col in leaf.columns]
+        self._arrow_schema = None
+
+        # Stack the bounds of all column spaces, so that checks are done on the whole block
+        self._low = self._stack_layout(lambda leaf: leaf.low, np.float64)
+        self._high = self._stack_layout(lambda leaf: leaf.high, np.float64)
+        self._integral = self._stack_layout(lambda leaf: np.full(leaf.size, leaf.integral), bool)
+        self._fallback = self._stack_layout(lambda leaf: np.full(leaf.size, not leaf.vectorized), bool)
+
+        self.set_validation()
+        self.reset_validation_stats()
         
         # Call the parent class constructor
         super().__init__(shape=None, dtype=None)
@@ -48,86 +152,736 @@ class DataFrameSpace(Space):
                 columns.append(parent_key + (key,))
         return columns
 
-    def sample(self, n_rows=None, index=None):
+    def _build_layout(self, space_dict):
+        """
+        Build the layout table with one :class:`LeafLayout` per final space, in column order.
+
+        Box spaces with a shape of (), (1,) or (n,) and Discrete spaces are marked as vectorized: they are sampled
+        and checked on whole arrays, and a Box of shape (n,) spans n adjacent columns. Any other space is handled
+        value by value with its own sample and contains methods.
+        """
+        layout = []
+        position = 0
+        for key in self._build_columns(space_dict):
+            space = self._get_leaf_space(key)
+            columns = [key]
+            if isinstance(space, Box) and len(space.shape) <= 1:
+                if space.low.size > 1:
+                    columns = [key[:-1] + (f"{key[-1]}_{i + 1}",) for i in range(space.low.size)]
+                low, high = space.low.astype(np.float64).ravel(), space.high.astype(np.float64).ravel()
+                integral, vectorized = bool(np.issubdtype(space.dtype, np.integer)), True
+            elif isinstance(space, Discrete):
+                low, high = np.array([space.start], dtype=np.float64), np.array([space.start + space.n - 1], dtype=np.float64)
+                integral, vectorized = True, True
+            else:
+                low, high = np.array([-np.inf]), np.array([np.inf])
+                integral, vectorized = False, False
+
+            leaf = LeafLayout(key=key, space=space, columns=columns, dtype=np.dtype(space.dtype), low=low, high=high,
+                              integral=integral, vectorized=vectorized, position=position)
+            layout.append(leaf)
+            position += leaf.size
+        return layout
+
+    def get_layout(self, column):
+        """
+        Get the :class:`LeafLayout` of the final space that a column belongs to.
+
+        :param column: A tuple representing the multi-level column.
+        """
+        return self._column_leaves[self.columns.get_loc(column)]
+
+    def get_block(self, x, key):
+        """
+        Get the values of the columns of one final space as a (rows, n) NumPy array.
+
+        The array is a view into x when x holds a single dtype block with the columns of the space, as the
+        frames returned by :meth:`sample`, :meth:`zeros` and :meth:`from_array` do, so that writing to it
+        writes to x. Otherwise it is a copy.
+
+        :param x: A pandas DataFrame with the columns of the space.
+        :param key: The key of the final space, as a tuple of the nested dict keys.
+        :return: A NumPy array of shape (rows, n), where n is the number of columns of the space.
+        """
+        leaf = self._leaf_by_key[key if isinstance(key, tuple) else (key,)]
+        if x.columns.equals(self.columns):
+            return x.to_numpy()[:, leaf.slice]
+        return x.loc[:, leaf.columns].to_numpy()
+
+    def set_block(self, x, key, values):
+        """
+        Write a (rows, n) array into the columns of one final space of x.
+
+        Writes through the view returned by :meth:`get_block` when possible and falls back to assigning the
+        columns otherwise.
+
+        :param x: A pandas DataFrame with the columns of the space.
+        :param key: The key of the final space, as a tuple of the nested dict keys.
+        :param values: An array-like that broadcasts to shape (rows, n).
+        """
+        leaf = self._leaf_by_key[key if isinstance(key, tuple) else (key,)]
+        array = x.to_numpy() if x.columns.equals(self.columns) else None
+
+        # to_numpy returns the same memory twice only if it is a view of the single block of x
+        if array is not None and array.flags.writeable and np.may_share_memory(array, x.to_numpy()):
+            array[:, leaf.slice] = values
+        else:
+            x.loc[:, leaf.columns] = np.broadcast_to(values, (len(x), leaf.size))
+
+    def zeros(self, n_rows=None, index=None, dtype=None):
+        """
+        Create a DataFrame of zeros with the columns of the space, backed by a single row-major 2-D array.
+
+        :param n_rows: Number of rows to generate for the DataFrame.
+        :param index: An optional pandas Index or MultiIndex to use for the DataFrame.
+        :param dtype: The dtype of the array. Defaults to the common dtype of the column spaces.
+        :return: A pandas DataFrame of zeros.
+        """
+        if index is not None:
+            n_rows = len(index)
+        elif n_rows is None:
+            n_rows = 1
+        if dtype is None:
+            dtype = np.result_type(*{leaf.dtype for leaf in self.layout})
+
+        data = np.zeros((n_rows, len(self.columns)), dtype=dtype, order="C")
+        return pd.DataFrame(data, columns=self.columns, index=index, copy=False)
+
+    def to_array(self, x, out=None, dtype=np.float32):
+        """
+        Convert a DataFrame of the space to a C-contiguous 2-D array of shape (rows, flatdim).
+
+        Each column is one element of the flat row vector, at the position given by the layout table. Discrete
+        values are kept as numbers rather than one-hot encoded. No copy is made when x is a single block of the
+        requested dtype backed by a row-major array, such as the frames returned by :meth:`sample`.
+
+        :param x: A pandas DataFrame with the columns of the space, or a pyarrow RecordBatch or Table.
+        :param out: An optional preallocated array of shape (rows, flatdim) to write into, e.g. reused across steps.
+        :param dtype: The dtype of the returned array when out is not given.
+        :return: A NumPy array of shape (rows, flatdim).
+        """
+        if _is_arrow(x):
+            x = self._select_arrow(x)
+            if out is None:
+                out = np.empty((x.num_rows, len(self.columns)), dtype=dtype)
+            for i, column in enumerate(x.columns):
+                out[:, i] = column.to_numpy()
+            return out
+
+        if not x.columns.equals(self.columns):
+            x = x[self.columns]
+
+        if out is None:
+            return np.ascontiguousarray(x.to_numpy(dtype=dtype))
+
+        assert out.shape == x.shape, f"Shape of out {out.shape} must be {x.shape}."
+        np.copyto(out, x.to_numpy(), casting="unsafe")
+        return out
+
+    def from_array(self, array, index=None):
+        """
+        Convert an array of shape (rows, flatdim) to a DataFrame of the space.
+
+        If all column spaces have the dtype of the array, the DataFrame wraps the array without copying.
+        Otherwise each column is cast to the dtype of its space.
+
+        :param array: An array-like of shape (rows, flatdim), or (flatdim,) for a single row.
+        :param index: An optional pandas Index or MultiIndex to use for the DataFrame.
+        :return: A pandas DataFrame.
+        """
+        array = np.asarray(array).reshape(-1, len(self.columns))
+        dtypes = {leaf.dtype for leaf in self.layout}
+
+        if dtypes == {array.dtype}:
+            return pd.DataFrame(array, columns=self.columns, index=index, copy=False)
+        if len(dtypes) == 1:
+            return pd.DataFrame(array.astype(dtypes.pop()), columns=self.columns, index=index, copy=False)
+        return self._frame_from_arrays([array[:, leaf.slice].astype(leaf.dtype) for leaf in self.layout], index)
+
+    @property
+    def arrow_schema(self):
+        """
+        The pyarrow schema of the arrow backend.
+
+        Every column is a field named by joining its keys with "/". The keys themselves are stored as JSON in the
+        "enflow.column" metadata of each field, and the list of all columns in the "enflow.columns" metadata of
+        the schema, so that the hierarchy can be rebuilt.
+        """
+        if self._arrow_schema is None:
+            pa = _import_pyarrow()
+            columns = [col for leaf in self.layout for col in leaf.columns]
+            fields = [pa.field(name, pa.from_numpy_dtype(leaf.dtype), metadata={"enflow.column": json.dumps(list(col))})
+                      for name, leaf, col in zip(self.arrow_names, self._column_leaves, columns)]
+            self._arrow_schema = pa.schema(fields, metadata={"enflow.columns": json.dumps([list(col) for col in columns])})
+        return self._arrow_schema
+
+    def to_arrow(self, x):
+        """
+        Convert a DataFrame of the space to a pyarrow RecordBatch with the flat :attr:`arrow_schema`.
+
+        The index of x is not kept.
+
+        :param x: A pandas DataFrame with the columns of the space.
+        :return: A pyarrow RecordBatch.
+        """
+        if not x.columns.equals(self.columns):
+            x = x[self.columns]
+        return self._record_batch_from_arrays([x.iloc[:, leaf.slice].to_numpy(dtype=leaf.dtype) for leaf in self.layout])
+
+    def from_arrow(self, x, index=None):
+        """
+        Convert a pyarrow RecordBatch or Table with the fields of :attr:`arrow_schema` to a DataFrame of the space.
+
+        :param x: A pyarrow RecordBatch or Table.
+        :param index: An optional pandas Index or MultiIndex to use for the DataFrame.
+        :return: A pandas DataFrame.
+        """
+        x = self._select_arrow(x)
+        columns = [column.to_numpy() for column in x.columns]
+        if len({leaf.dtype for leaf in self.layout}) == 1:
+            return self.from_array(np.column_stack(columns), index=index)
+        return self._frame_from_arrays([np.column_stack(columns[leaf.slice]) for leaf in self.layout], index)
+
+    def _select_arrow(self, x):
+        """
+        Select the fields of the space, in column order, from a pyarrow RecordBatch or Table.
+        """
+        if x.schema.names != self.arrow_names:
+            x = x.select(self.arrow_names)
+        return x
+
+    def _record_batch_from_arrays(self, arrays):
+        """
+        Create a pyarrow RecordBatch from one (rows, n) array per final space.
+
+        Every column is made contiguous and cast to the dtype of its space, so that pyarrow can wrap it.
+        """
+        pa = _import_pyarrow()
+        columns = [pa.array(column)
+                   for leaf, array in zip(self.layout, arrays)
+                   for column in np.ascontiguousarray(array.T, dtype=leaf.dtype)]
+        return pa.RecordBatch.from_arrays(columns, schema=self.arrow_schema)
+
+    @property
+    def is_np_flattenable(self):
+        return True
+
+    def _stack_layout(self, get, dtype):
+        """
+        Concatenate a per-leaf array from the layout into one array aligned with self.columns.
+        """
+        if not self.layout:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate([get(leaf) for leaf in self.layout]).astype(dtype)
+
+    def sample(self, n_rows=None, index=None, batched=True):
         """
         Generate a sample from the space.
         
         :param n_rows: Number of rows to generate for the DataFrame.
         :param index: An optional pandas Index or MultiIndex to use for the DataFrame.
-        :return: A pandas DataFrame with sampled values.
+        :param batched: If True, draw all rows of a column with one call to its space's random generator and
+                        assemble the DataFrame from a single 2-D array. For a fixed seed the values are the same
+                        as with the per-row path (batched=False).
+        :return: A pandas DataFrame with sampled values, or a pyarrow RecordBatch without index for the arrow
+                 backend.
         """
         if index is not None:
             assert isinstance(index, (pd.Index, pd.MultiIndex)), "Index must be a pandas Index or MultiIndex."
             n_rows = len(index)
         elif n_rows is None:
             n_rows = 1  # Default to 1 row if neither n_rows nor index are provided
+
+        if self.backend == "arrow":
+            sample_from_space = self._sample_batch_from_space if batched else self._sample_from_space
+            return self._record_batch_from_arrays([sample_from_space(leaf.space, n_rows).reshape(n_rows, leaf.size)
+                                                   for leaf in self.layout])
+
+        if batched:
+            return self._sample_batched(n_rows, index)
         
         # Sample values for each column based on the gym space
-        data = {col: self._sample_from_space(self.space_dict, col, n_rows) for col in self.columns}
+        data = [self._sample_from_space(leaf.space, n_rows).reshape(n_rows, leaf.size) for leaf in self.layout]
 
         # Create the DataFrame with the sampled data
-        df = pd.DataFrame(data, columns=self.columns, index=index)
+        df = self._frame_from_arrays(data, index)
         return df
 
-    def _sample_from_space(self, space_dict, col, n_rows):
+    def _sample_batched(self, n_rows, index=None, sample_leaf=None):
         """
-        Traverse the space_dict to reach the final space (e.g., Box, Discrete) and sample from it.
-        
-        :param space_dict: The gym.spaces.Dict or space container.
+        Sample all rows of every column at once.
+
+        If all column spaces share a dtype, the columns are written into one row-major 2-D array that pandas
+        wraps as a single block without copying. Otherwise the DataFrame is built column by column.
+
+        :param sample_leaf: An optional function (leaf, n_rows) -> array of shape (n_rows, leaf.size). Defaults
+                            to drawing from the random generator of each final space.
+        """
+        if sample_leaf is None:
+            sample_leaf = lambda leaf, n_rows: self._sample_batch_from_space(leaf.space, n_rows).reshape(n_rows, leaf.size)
+        dtypes = {leaf.dtype for leaf in self.layout}
+
+        if len(dtypes) == 1:
+            data = np.empty((n_rows, len(self.columns)), dtype=dtypes.pop(), order="C")
+            for leaf in self.layout:
+                data[:, leaf.slice] = sample_leaf(leaf, n_rows)
+            return pd.DataFrame(data, columns=self.columns, index=index, copy=False)
+
+        data = [sample_leaf(leaf, n_rows) for leaf in self.layout]
+        return self._frame_from_arrays(data, index)
+
+    def seed(self, seed=None):
+        """
+        Seed the space from one numpy SeedSequence.
+
+        Each final space gets its own independent generator spawned from the sequence, so that sample is
+        reproducible. The sequence also drives :meth:`sample_rows` and :meth:`sample_parallel`.
+
+        :param seed: An int, a sequence of ints, a numpy SeedSequence or None for fresh entropy.
+        :return: The entropy of the SeedSequence, which reproduces the space when passed as seed.
+        """
+        if isinstance(seed, np.random.SeedSequence):
+            self._seed_sequence = seed
+        else:
+            self._seed_sequence = np.random.SeedSequence(seed)
+
+        self._np_random = np.random.Generator(np.random.PCG64(self._child_seed_sequence(3)))
+        for leaf in self.layout:
+            leaf.space._np_random = np.random.Generator(np.random.PCG64(self._child_seed_sequence(0, leaf.position)))
+        return self._seed_sequence.entropy
+
+    @property
+    def seed_sequence(self):
+        if getattr(self, "_seed_sequence", None) is None:
+            self._seed_sequence = np.random.SeedSequence()
+        return self._seed_sequence
+
+    def _child_seed_sequence(self, *key):
+        """
+        Derive the child SeedSequence of the space's sequence with a fixed spawn key.
+
+        Unlike SeedSequence.spawn, the result does not depend on how many children were spawned before.
+        """
+        seed_sequence = self.seed_sequence
+        return np.random.SeedSequence(seed_sequence.entropy,
+                                      spawn_key=seed_sequence.spawn_key + key,
+                                      pool_size=seed_sequence.pool_size)
+
+    def spawn_seeds(self, n):
+        """
+        Derive n independent SeedSequences from the space's sequence, e.g. one per worker or per episode.
+
+        Seeding a copy of the space with the i-th sequence gives the same samples in every run.
+        """
+        return [self._child_seed_sequence(2, i) for i in range(n)]
+
+    def sample_rows(self, start, stop, index=None):
+        """
+        Generate rows start to stop of a reproducible sample defined by the space's SeedSequence.
+
+        Rows are drawn in blocks of sample_block_size rows, each from its own generator keyed by the position of
+        the final space and the block number. The values of a row therefore do not depend on how the rows are
+        split, and concatenating sample_rows over any split of range(n_rows) equals sample_rows(0, n_rows).
+
+        :param start: The first row to generate.
+        :param stop: The row after the last row to generate.
+        :param index: An optional pandas Index or MultiIndex of length stop - start to use for the DataFrame.
+        :return: A pandas DataFrame with sampled values.
+        """
+        return self._sample_batched(stop - start, index,
+                                    sample_leaf=lambda leaf, n_rows: self._sample_leaf_rows(leaf, start, stop))
+
+    def _sample_leaf_rows(self, leaf, start, stop):
+        """
+        Draw rows start to stop of one final space from the generators of the blocks that contain them.
+        """
+        if stop <= start:
+            return np.empty((0, leaf.size), dtype=leaf.dtype)
+
+        block_size = self.sample_block_size
+        first_block, last_block = start // block_size, -(-stop // block_size)
+
+        blocks = []
+        for block in range(first_block, last_block):
+            rng = np.random.Generator(np.random.PCG64(self._child_seed_sequence(1, leaf.position, block)))
+            blocks.append(self._sample_batch_from_space(leaf.space, block_size, rng=rng).reshape(block_size, leaf.size))
+
+        offset = first_block * block_size
+        return np.concatenate(blocks)[start - offset:stop - offset]
+
+    def sample_parallel(self, n_rows=None, index=None, n_workers=None, executor=None):
+        """
+        Generate a reproducible sample with the rows split across a process pool.
+
+        The result is identical to sample_rows(0, n_rows), whatever the number of workers.
+
+        :param n_rows: Number of rows to generate for the DataFrame.
+        :param index: An optional pandas Index or MultiIndex to use for the DataFrame.
+        :param n_workers: The number of worker processes. Defaults to the number of CPUs.
+        :param executor: An optional concurrent.futures executor to reuse instead of starting a process pool.
+        :return: A pandas DataFrame with sampled values.
+        """
+        if index is not None:
+            n_rows = len(index)
+        elif n_rows is None:
+            n_rows = 1
+
+        # Make sure every worker gets the same SeedSequence
+        self.seed_sequence
+
+        n_blocks = max(1, -(-n_rows // self.sample_block_size))
+        n_chunks = min(n_blocks, n_workers or os.cpu_count() or 1)
+        chunk_size = -(-n_blocks // n_chunks) * self.sample_block_size
+        starts = list(range(0, n_rows, chunk_size)) or [0]
+        stops = [min(start + chunk_size, n_rows) for start in starts]
+
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=n_chunks) as executor:
+                frames = list(executor.map(_sample_rows, itertools.repeat(self), starts, stops))
+        else:
+            frames = list(executor.map(_sample_rows, itertools.repeat(self), starts, stops))
+
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        df.index = index if index is not None else pd.RangeIndex(n_rows)
+        return df
+
+    def _frame_from_arrays(self, arrays, index=None):
+        """
+        Create a DataFrame with self.columns from one (rows, n) array per final space, keeping the dtype of
+        each array.
+        """
+        columns = (column for array in arrays for column in array.T)
+        df = pd.DataFrame(dict(enumerate(columns)), index=index)
+        df.columns = self.columns
+        return df
+
+    def _get_leaf_space(self, col):
+        """
+        Traverse the space_dict to reach the final space (e.g., Box, Discrete) of a column.
+
         :param col: A tuple representing the multi-level column.
-        :param n_rows: The number of rows to sample.
-        :return: A sampled array from the corresponding space.
+        :return: The final gym.Space of the column.
         """
-        space = space_dict
+        space = self.space_dict
         for key in col:
             if isinstance(space, Dict):
-                space = space.spaces[key]  # Traverse the space_dict using the column keys
+                space = space.spaces[key]
             else:
                 break
-            
-        # Now that space is a final gym.Space (e.g., Box, Discrete, etc.), we can sample from it
+        return space
+
+    def _sample_batch_from_space(self, space, n_rows, rng=None):
+        """
+        Draw n_rows samples from a final space with a single call to its random generator.
+
+        Discrete spaces, and Box spaces whose coordinates all have the same type of interval, are sampled in
+        one call. Other spaces fall back to sampling row by row.
+
+        :param space: A final gym.Space (e.g., Box, Discrete).
+        :param n_rows: The number of rows to sample.
+        :param rng: An optional numpy Generator to draw from instead of the space's own generator.
+        :return: A sampled array with n_rows as first dimension.
+        """
+        if rng is None:
+            rng = space.np_random
+
+        if isinstance(space, Discrete):
+            return space.start + rng.integers(space.n, size=n_rows, dtype=space.dtype.type)
+
+        if (isinstance(space, Box) and len(space.shape) <= 1
+                and np.all(space.bounded_below == space.bounded_below.flat[0])
+                and np.all(space.bounded_above == space.bounded_above.flat[0])):
+            # Mirrors Box.sample, so that the values are identical to calling it n_rows times
+            size = (n_rows,) + space.shape
+            high = space.high if space.dtype.kind == "f" else space.high.astype("int64") + 1
+            bounded_below, bounded_above = space.bounded_below.flat[0], space.bounded_above.flat[0]
+
+            if bounded_below and bounded_above:
+                sample = rng.uniform(low=space.low, high=high, size=size)
+            elif bounded_below:
+                sample = rng.exponential(size=size) + space.low
+            elif bounded_above:
+                sample = -rng.exponential(size=size) + high
+            else:
+                sample = rng.normal(size=size)
+
+            if space.dtype.kind in ["i", "u", "b"]:
+                sample = np.floor(sample)
+            if np.issubdtype(space.dtype, np.integer):
+                iinfo = np.iinfo(space.dtype)
+                dtype_min, dtype_max = iinfo.min, iinfo.max
+                if space.dtype == np.int64:
+                    dtype_min, dtype_max = dtype_min + 2, dtype_max - 2
+                sample = sample.clip(min=dtype_min, max=dtype_max)
+            sample = sample.astype(space.dtype)
+            if space.dtype == np.int64:
+                sample = sample.clip(min=space.low, max=space.high)
+
+            return sample
+
+        space_rng = space.np_random
+        space._np_random = rng
+        try:
+            return np.array([space.sample().squeeze() for _ in range(n_rows)])
+        finally:
+            space._np_random = space_rng
+
+    def _sample_from_space(self, space, n_rows):
+        """
+        Sample from a final space (e.g., Box, Discrete) row by row.
+        
+        :param space: A final gym.Space (e.g., Box, Discrete).
+        :param n_rows: The number of rows to sample.
+        :return: A sampled array from the corresponding space.
+        """
         return np.array([space.sample().squeeze() for _ in range(n_rows)])
 
     def contains(self, x):
         """
         Check if a given dataframe x is contained within the space.
         
-        :param x: A pandas DataFrame.
+        :param x: A pandas DataFrame, or a pyarrow RecordBatch or Table.
         :return: True if x is contained in the space, False otherwise.
         """
+        return self.check(x).valid
+
+    def check(self, x):
+        """
+        Check a given dataframe x against the space and report where it fails.
+
+        All columns are checked at once against the stacked bounds of the column spaces.
+
+        :param x: A pandas DataFrame, or a pyarrow RecordBatch or Table.
+        :return: A :class:`ContainsReport` with the missing columns, and the columns and rows holding values
+                 outside the space. For pyarrow values the rows are given as positions.
+        """
+        x, report = self._align(x)
+        if report is not None:
+            return report
+        return self._report(*self._check_part(x))
+
+    def set_validation(self, mode="full", n_rows=64, n_columns=None, chunk_size=10000):
+        """
+        Configure how :meth:`validate` checks values, trading coverage for a bounded cost.
+
+        :param mode: One of
+                     "off": skip the checks, only count them;
+                     "sampled": check n_rows random rows and n_columns random columns;
+                     "full": check every value at once, like :meth:`check`;
+                     "chunked": check every value, chunk_size rows at a time, to bound the memory used
+                     for very large frames.
+        :param n_rows: The number of rows checked per call in "sampled" mode.
+        :param n_columns: The number of columns checked per call in "sampled" mode. Defaults to all columns.
+        :param chunk_size: The number of rows checked at a time in "chunked" mode.
+        """
+        assert mode in VALIDATION_MODES, f"Validation mode must be one of {VALIDATION_MODES}."
+        self.validation_mode = mode
+        self.validation_n_rows = n_rows
+        self.validation_n_columns = n_columns
+        self.validation_chunk_size = chunk_size
+
+    def validate(self, x, mode=None):
+        """
+        Check x with the configured validation mode and update :attr:`validation_stats`.
+
+        :param x: A pandas DataFrame, or a pyarrow RecordBatch or Table.
+        :param mode: Optional mode overriding the one set with :meth:`set_validation` for this call.
+        :return: A :class:`ContainsReport`. In "off" mode it is always valid, and in "sampled" mode it only
+                 covers the sampled values.
+        """
+        mode = mode or self.validation_mode
+        stats = self.validation_stats
+        stats.n_checks += 1
+
+        if mode == "off":
+            stats.n_skipped += 1
+            return ContainsReport(valid=True)
+
+        x, report = self._align(x)
+        if report is None:
+            if mode == "sampled":
+                report = self._validate_sampled(x)
+            elif mode == "chunked":
+                report = self._validate_chunked(x)
+            else:
+                report = self._report(*self._check_part(x))
+
+        stats.n_violations += report.n_violations
+        if not report.valid:
+            stats.n_invalid += 1
+        return report
+
+    def reset_validation_stats(self):
+        self.validation_stats = ValidationStats()
+
+    def _validate_sampled(self, x):
+        """
+        Check a random subset of the rows and columns of x.
+        """
+        n_rows, n_columns = len(x), len(self.columns)
+        rows = columns = None
+        if n_rows > self.validation_n_rows:
+            rows = np.sort(self.np_random.choice(n_rows, size=self.validation_n_rows, replace=False))
+        if self.validation_n_columns is not None and n_columns > self.validation_n_columns:
+            columns = np.sort(self.np_random.choice(n_columns, size=self.validation_n_columns, replace=False))
+        return self._report(*self._check_part(x, rows=rows, columns=columns))
+
+    def _validate_chunked(self, x):
+        """
+        Check every value of x, chunk_size rows at a time, keeping only the summary of each chunk.
+        """
+        invalid_columns = np.zeros(len(self.columns), dtype=bool)
+        invalid_rows = []
+        n_violations = 0
+        for start in range(0, len(x), self.validation_chunk_size):
+            invalid, index, _ = self._check_part(x, rows=slice(start, start + self.validation_chunk_size))
+            invalid_columns |= invalid.any(axis=0)
+            invalid_rows.append(index[invalid.any(axis=1)])
+            n_violations += int(invalid.sum())
+
+        return ContainsReport(valid=n_violations == 0,
+                              invalid_columns=self.columns[invalid_columns].tolist(),
+                              invalid_rows=invalid_rows[0].append(invalid_rows[1:]) if invalid_rows else None,
+                              n_violations=n_violations)
+
+    def _align(self, x):
+        """
+        Put the columns of x in the order of the space.
+
+        :return: A tuple of the aligned x and None, or of x and a :class:`ContainsReport` if x is not a frame or
+                 misses columns.
+        """
+        if _is_arrow(x):
+            names = set(x.schema.names)
+            missing_columns = [col for col, name in zip(self.columns, self.arrow_names) if name not in names]
+            if missing_columns:
+                return x, ContainsReport(valid=False, missing_columns=missing_columns)
+            return self._select_arrow(x), None
+
         if not isinstance(x, pd.DataFrame):
-            return False
-        
+            return x, ContainsReport(valid=False)
+
         # Check if all columns are present
-        if not all(col in x.columns for col in self.columns):
-            return False
-        
-        # Check if each column's values lie within the space
-        for col in self.columns:
-            space = self.space_dict
-            for key in col:
-                space = space.spaces[key]
-            if isinstance(space, Dict):
-                # Recursively check Dict spaces
-                if not all(self._contains_space(space, x[subcol]) for subcol in x.columns):
-                    return False
+        if not x.columns.equals(self.columns):
+            missing_columns = [col for col in self.columns if col not in x.columns]
+            if missing_columns:
+                return x, ContainsReport(valid=False, missing_columns=missing_columns)
+            x = x[self.columns]
+        return x, None
+
+    def _check_part(self, x, rows=None, columns=None):
+        """
+        Compute the violations of some rows and columns of an aligned x.
+
+        :param rows: None for all rows, a slice, or an array of row positions.
+        :param columns: None for all columns, or an array of column positions.
+        :return: A tuple of the boolean array of violations, the index of the rows and the column positions.
+        """
+        all_columns = columns is None
+        if all_columns:
+            columns = np.arange(len(self.columns))
+
+        if _is_arrow(x):
+            if isinstance(rows, slice):
+                start = min(rows.start, x.num_rows)
+                stop = min(rows.stop, x.num_rows)
+                x, index = x.slice(start, stop - start), pd.RangeIndex(start, stop)
+            elif rows is not None:
+                x, index = x.take(rows), pd.Index(rows)
             else:
-                # Check using the space's contains method
-                if not all(space.contains(val) for val in x[col]):
-                    return False
-        
-        return True
+                index = pd.RangeIndex(x.num_rows)
+            if not all_columns:
+                x = x.select([self.arrow_names[i] for i in columns])
+            values = np.column_stack([column.to_numpy() for column in x.columns])
+            get_column = lambda j: x.column(j).to_pylist()
+        else:
+            if rows is not None or not all_columns:
+                x = x.iloc[slice(None) if rows is None else rows, slice(None) if all_columns else columns]
+            values, index = x.to_numpy(), x.index
+            get_column = lambda j: x.iloc[:, j]
+
+        return self._invalid_mask(values, get_column, columns), index, columns
+
+    def _report(self, invalid, index, columns):
+        """
+        Summarize a boolean array of violations of shape (rows, columns) into a :class:`ContainsReport`.
+        """
+        invalid_columns = invalid.any(axis=0)
+        invalid_rows = invalid.any(axis=1)
+        n_violations = int(invalid.sum())
 
-    def _contains_space(self, space, x):
+        return ContainsReport(valid=n_violations == 0,
+                              invalid_columns=self.columns[columns[invalid_columns]].tolist(),
+                              invalid_rows=index[invalid_rows],
+                              n_violations=n_violations)
+
+    def _invalid_mask(self, values, get_column, columns):
         """
-        Recursively check if the space contains the values of a sub-space.
+        Compute a boolean array of shape (rows, columns) that is True where a value lies outside its column space.
+
+        :param values: An array of shape (rows, len(columns)).
+        :param get_column: A function that returns the values of the j-th checked column, used for spaces that are
+                           not vectorized.
+        :param columns: The positions in self.columns of the checked columns.
         """
-        if isinstance(space, Dict):
-            # Recursively check Dict spaces
-            return all(self._contains_space(sub_space, x[subcol]) for subcol, sub_space in space.spaces.items())
+        shape = values.shape
+        if values.dtype.kind not in "biuf":
+            try:
+                values = values.astype(np.float64)
+            except (ValueError, TypeError):
+                values = None
+
+        if values is None:
+            invalid = np.ones(shape, dtype=bool)
+            fallback = np.ones(len(columns), dtype=bool)
         else:
-            # Use the space's contains method for non-Dict spaces
-            return all(space.contains(val) for val in x)
+            # NaN compares False, so it is reported as a violation
+            with np.errstate(invalid="ignore"):
+                invalid = ~((values >= self._low[columns]) & (values <= self._high[columns]))
+            integral = self._integral[columns]
+            if integral.any():
+                integral_values = values[:, integral]
+                invalid[:, integral] |= integral_values != np.floor(integral_values)
+            fallback = self._fallback[columns]
+
+        for j in np.flatnonzero(fallback):
+            space = self._column_leaves[columns[j]].space
+            invalid[:, j] = [not space.contains(val) for val in get_column(j)]
+
+        return invalid
 
     def __repr__(self):
         return f"DataFrameSpace({self.space_dict})"
+
+
+def _sample_rows(space, start, stop):
+    return space.sample_rows(start, stop)
+
+
+# A DataFrameSpace has no fixed number of rows, so only a frame of one row flattens, to the flatdim values that fit
+# the Box of flatten_space. Frames of several rows can be converted with to_array and from_array.
+@flatdim.register(DataFrameSpace)
+def _flatdim_dataframe(space: DataFrameSpace) -> int:
+    return len(space.columns)
+
+
+@flatten.register(DataFrameSpace)
+def _flatten_dataframe(space: DataFrameSpace, x: pd.DataFrame) -> np.ndarray:
+    if len(x) != 1:
+        raise ValueError(f"Only a frame of one row can be flattened to the space of flatten_space, got {len(x)} rows. "
+                         f"Use DataFrameSpace.to_array to convert frames of several rows.")
+    return space.to_array(x).ravel()
+
+
+@flatten_space.register(DataFrameSpace)
+def _flatten_space_dataframe(space: DataFrameSpace) -> Box:
+    return Box(low=space._low.astype(np.float32), high=space._high.astype(np.float32), dtype=np.float32)
+
+
+@unflatten.register(DataFrameSpace)
+def _unflatten_dataframe(space: DataFrameSpace, x: np.ndarray) -> pd.DataFrame:
+    x = np.asarray(x)
+    if x.size != len(space.columns):
+        raise ValueError(f"Only an array of flatdim = {len(space.columns)} values can be unflattened to a frame of one "
+                         f"row, got shape {x.shape}. Use DataFrameSpace.from_array to convert several rows.")
+    return space.from_array(x.reshape(1, -1))
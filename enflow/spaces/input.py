@@ -9,5 +9,6 @@ class InputSpace(BaseSpace):
     """
     The input space for the energy model.
     """
+    __slots__ = ()
 
 StateSpace = InputSpace
\ No newline at end of file
@@ -9,5 +9,6 @@ class OutputSpace(BaseSpace):
     """
     The output space for the energy model.
     """
+    __slots__ = ()
 
 ActionSpace = OutputSpace
\ No newline at end of file